@@ -0,0 +1,16 @@
+-- Migration: Server-side daily PnL aggregate used by RiskManager.check_daily_loss
+-- Returns the sum of realized PnL of trades closed today (UTC) for the given mode
+CREATE OR REPLACE FUNCTION get_daily_pnl(p_mode TEXT)
+RETURNS NUMERIC
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(SUM(pnl), 0)
+    FROM trades
+    WHERE status = 'CLOSED'
+      AND mode = p_mode
+      AND close_time >= date_trunc('day', now() AT TIME ZONE 'utc') AT TIME ZONE 'utc';
+$$;
+
+-- Index for faster daily scans
+CREATE INDEX IF NOT EXISTS idx_trades_mode_status_close_time ON trades (mode, status, close_time DESC);
@@ -0,0 +1,66 @@
+import math
+import random
+
+class Backoff:
+    """
+    Capped exponential backoff with jitter.
+
+    Each call to next_delay() counts one consecutive failure and returns how long
+    to wait: base * 2^(failures-1), capped at `cap`, plus up to `jitter` * delay of
+    random noise so that many retrying callers don't wake up in lockstep.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 60.0, jitter: float = 0.3):
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+        self.failures = 0
+
+    def next_delay(self) -> float:
+        self.failures += 1
+        delay = min(self.cap, self.base * (2 ** (self.failures - 1)))
+        return delay + random.uniform(0, delay * self.jitter)
+
+    def reset(self):
+        self.failures = 0
+
+class SymbolBreaker:
+    """
+    Per-symbol failure tracking for a loop that visits every symbol once per pass.
+
+    A failing symbol is skipped for its Backoff delay rounded up to whole passes
+    (at least the next one), so the backoff works at the pace of the loop; after
+    `max_failures` failures in a row the breaker opens and the symbol is skipped
+    for `cooldown` seconds worth of passes. Call start_pass() once per pass.
+    """
+
+    def __init__(self, pass_interval: float, max_failures: int = 5, cooldown: float = 300.0):
+        self.pass_interval = pass_interval
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.current_pass = 0
+        self.backoffs = {}     # {symbol: Backoff}
+        self.retry_pass = {}   # {symbol: first pass in which the symbol is tried again}
+
+    def start_pass(self):
+        self.current_pass += 1
+
+    def should_skip(self, symbol) -> bool:
+        return self.current_pass < self.retry_pass.get(symbol, 0)
+
+    def record(self, symbol, ok: bool) -> bool:
+        """Record the outcome of a visit. Returns True when it opened the breaker."""
+        backoff = self.backoffs.setdefault(symbol, Backoff(base=self.pass_interval, cap=self.cooldown))
+        if ok:
+            backoff.reset()
+            self.retry_pass.pop(symbol, None)
+            return False
+
+        delay = backoff.next_delay()
+        opened = backoff.failures > self.max_failures
+        if opened:
+            delay = self.cooldown
+            backoff.reset()
+        # Passes are at least pass_interval apart, so skipping this many waits out the delay
+        self.retry_pass[symbol] = self.current_pass + 1 + math.ceil(delay / self.pass_interval)
+        return opened
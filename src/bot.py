@@ -1,14 +1,21 @@
 import asyncio
 import logging
+import time
+import traceback
 from src.config import Config
 from src.exchange import Exchange
 from src.database import Database
 from src.strategy import Strategy
 from src.risk_manager import RiskManager
 from src.logger_handler import SupabaseHandler
+from src.backoff import Backoff
 from datetime import datetime
-from telegram import Bot
-from telegram.error import TelegramError
+from src.notifier import TelegramNotifier, KILL_SWITCH_MESSAGE
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
 
 # Configure Logging
 logging.basicConfig(
@@ -21,6 +28,11 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("postgrest").setLevel(logging.WARNING)
 
+# Minimum seconds between heartbeat logs (scan or manage) for the same symbol
+HEARTBEAT_LOG_INTERVAL = 60
+
+DAILY_LOSS_MESSAGE = "🚨 **DAILY LOSS LIMIT EXCEEDED**\nKill Switch activated."
+
 class MrRobotTrade:
     def __init__(self):
         self.exchange = Exchange()
@@ -31,26 +43,33 @@ class MrRobotTrade:
         self.active_trades = [] # List of active trade objects
         self.MAX_OPEN_TRADES = 3
         self.MAX_EXPOSURE_PCT = 0.30 # 30% total exposure
-        self.tg_bot = None
+        self.notifier = TelegramNotifier()
+        self.loop_backoff = Backoff(base=15, cap=300)  # Main loop error backoff
+        self.last_heartbeat_log = {}  # {symbol: time.monotonic() of the last heartbeat log}
+        self.trade_opened = asyncio.Event()  # Set by look_for_entry to wake the main loop
+        self.unlogged_close_pnl = []  # PnL of trades closed this cycle, logged to the wallet in one write
 
         # Add Supabase Error Handler
         db_handler = SupabaseHandler(self.db)
         logging.getLogger().addHandler(db_handler)
 
-        if Config.TELEGRAM_BOT_TOKEN:
-            self.tg_bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
-
-        # Load any existing OPEN trade from DB
         # Load any existing OPEN trades from DB
         self._load_open_trades()
 
     async def send_notification(self, message):
-        """Send message to Telegram."""
-        if self.tg_bot and Config.TELEGRAM_CHAT_ID:
+        """Send message to Telegram without blocking the trading loop."""
+        self.notifier.notify(message)
+
+    async def close(self):
+        """Log closes the main loop has not recorded yet, then release the exchange and Telegram HTTP connections."""
+        if self.unlogged_close_pnl:
             try:
-                await self.tg_bot.send_message(chat_id=Config.TELEGRAM_CHAT_ID, text=message)
-            except TelegramError as e:
-                logging.error(f"Telegram Error: {e}")
+                await self.log_balance_after_close(sum(self.unlogged_close_pnl))
+                self.unlogged_close_pnl.clear()
+            except Exception as e:
+                logging.error(f"Error logging balance on shutdown: {e}")
+        await self.exchange.close()
+        await self.notifier.close()
 
     def _load_open_trades(self):
         """Recover state from DB."""
@@ -64,14 +83,20 @@ class MrRobotTrade:
 
             if response.data and len(response.data) > 0:
                 self.active_trades = response.data
+
+                # Inject settings: one query for every symbol instead of one per trade
+                settings_by_symbol = {}
+                try:
+                    symbols = list({trade['symbol'] for trade in self.active_trades})
+                    settings_res = client.table('market_settings').select('*').in_('symbol', symbols).execute()
+                    for settings in settings_res.data or []:
+                        settings_by_symbol.setdefault(settings['symbol'], settings)
+                except:
+                    pass
+
                 for trade in self.active_trades:
-                    # Inject settings
-                    try:
-                        settings_res = client.table('market_settings').select('*').eq('symbol', trade['symbol']).execute()
-                        if settings_res.data:
-                            trade['market_settings'] = settings_res.data[0]
-                    except:
-                        pass
+                    if trade['symbol'] in settings_by_symbol:
+                        trade['market_settings'] = settings_by_symbol[trade['symbol']]
                     logging.info(f"Resumed OPEN trade: {trade['id']} ({trade['symbol']})")
         except Exception as e:
             logging.error(f"Error loading open trades: {e}")
@@ -96,35 +121,45 @@ class MrRobotTrade:
         logging.info(f"Starting MrRobot Trade [{Config.TRADING_MODE}] - Balance: ${total_balance:.2f}")
         await self.send_notification(start_msg)
 
+        # Bootstrap symbol cooldowns with a single query
+        self.risk_manager.preload_cooldowns()
+
         while self.running:
             try:
                 # 0. Check Kill Switch (Global Safety)
                 if not self.risk_manager.check_kill_switch():
                     logging.critical("🚨 System halted by Kill Switch")
-                    await self.send_notification("🚨 **KILL SWITCH ACTIVATED**\nTrading halted for safety.")
+                    await self.send_notification(KILL_SWITCH_MESSAGE)
                     await asyncio.sleep(300)  # Wait 5 minutes before checking again
                     continue
 
-                # 1. Manage Existing Trade (Global Single Trade Rule)
                 # 1. Manage Existing Trades
                 if self.active_trades:
-                    # Create a copy to iterate safely as we might remove items
-                    for trade in self.active_trades[:]:
-                        symbol = trade['symbol']
-                    candles = await self.exchange.get_candles(symbol) # Pass symbol
-                    if not candles:
-                        await asyncio.sleep(10)
-                        continue
+                    # Group trades by symbol (this also snapshots the list, as we might remove items)
+                    trades_by_symbol = {}
+                    for trade in self.active_trades:
+                        trades_by_symbol.setdefault(trade['symbol'], []).append(trade)
 
-                    current_price = await self.exchange.get_current_price(symbol) # Pass symbol
-                    if current_price is None:
-                        await asyncio.sleep(10)
-                        continue
+                    candles_by_symbol, prices = await self.fetch_market_data(list(trades_by_symbol))
+
+                    for symbol, trades in trades_by_symbol.items():
+                        candles = candles_by_symbol.get(symbol)
+                        current_price = prices.get(symbol)
+                        if not candles or current_price is None:
+                            continue
+
+                        # Indicators are updated once per symbol, not once per trade.
+                        # Trades are managed even without them (stop/target only need the price)
+                        indicators = await self.update_indicators(symbol, candles)
 
-                    df = self.strategy.parse_data(candles)
-                    df = self.strategy.calculate_indicators(df)
+                        for trade in trades:
+                            await self.manage_trade(indicators, current_price, trade)
 
-                    await self.manage_trade(df, current_price, trade)
+                # One wallet update for every trade closed in this pass (or left over
+                # from a pass that failed midway)
+                if self.unlogged_close_pnl:
+                    await self.log_balance_after_close(sum(self.unlogged_close_pnl))
+                    self.unlogged_close_pnl.clear()
 
                 # 2. Scanning Mode (Only if slots available)
                 if len(self.active_trades) < self.MAX_OPEN_TRADES:
@@ -134,39 +169,41 @@ class MrRobotTrade:
                         await asyncio.sleep(15)
                         continue
 
-                    for market in active_markets:
+                    # Skip symbols already open (they were refreshed by the manage step above)
+                    open_symbols = {t['symbol'] for t in self.active_trades}
+                    scan_markets = [m for m in active_markets if m['symbol'] not in open_symbols]
+
+                    # Fetch Data (candles per symbol + one batched price request)
+                    candles_by_symbol, prices = await self.fetch_market_data([m['symbol'] for m in scan_markets])
+
+                    for market in scan_markets:
                         symbol = market['symbol']
-                        # Fetch Data
-                        candles = await self.exchange.get_candles(symbol)
+                        candles = candles_by_symbol.get(symbol)
                         if not candles:
                             continue
 
-                        df = self.strategy.parse_data(candles)
-                        df = self.strategy.calculate_indicators(df)
-                        current_price = await self.exchange.get_current_price(symbol)
+                        indicators = await self.update_indicators(symbol, candles)
 
-                        if current_price is None:
-                            continue
-
-                        # Check Entry (Skip symbols already open)
-                        is_open = any(t['symbol'] == symbol for t in self.active_trades)
-                        if is_open:
+                        current_price = prices.get(symbol)
+                        if indicators is None or current_price is None:
                             continue
 
                         # Check Entry
-                        entered = await self.look_for_entry(df, current_price, market)
-
-                        # Heartbeat Log - Show monitoring activity
-                        if not entered:
-                            last_row = df.iloc[-1]
-                            ema50 = last_row.get('ema_50', 0)
-                            ema200 = last_row.get('ema_200', 0)
-                            adx = last_row.get('adx', 0)
+                        entered = await self.look_for_entry(indicators, current_price, market)
+
+                        # Heartbeat Log - Show monitoring activity (throttled per symbol, skipped when INFO is off)
+                        now = time.monotonic()
+                        if (not entered and logging.getLogger().isEnabledFor(logging.INFO)
+                                and now - self.last_heartbeat_log.get(symbol, float('-inf')) >= HEARTBEAT_LOG_INTERVAL):
+                            self.last_heartbeat_log[symbol] = now
+                            ema50 = indicators.live_ema_short or 0
+                            ema200 = indicators.ema_long or 0
+                            adx = indicators.adx or 0
                             trend = "BULL" if ema50 > ema200 else "BEAR"
 
                             logging.info(
-                                f"[{symbol}] Price: {current_price:.2f} | "
-                                f"Trend: {trend} (50/200) | ADX: {adx:.1f} | Status: Monitoring"
+                                "[%s] Price: %.2f | Trend: %s (50/200) | ADX: %.1f | Status: Monitoring",
+                                symbol, current_price, trend, adx
                             )
 
                         if entered:
@@ -174,29 +211,67 @@ class MrRobotTrade:
                             if len(self.active_trades) >= self.MAX_OPEN_TRADES:
                                 break
 
-                        # Small delay between symbols to avoid rate limits
-                        await asyncio.sleep(1)
+                # Clean pass: next error starts from the base delay again
+                self.loop_backoff.reset()
 
-                # Wait before next cycle
-                await asyncio.sleep(15)
+                # Wait before next cycle, or start it right away when a trade was
+                # opened so its stop/target get set up without waiting a full cycle
+                try:
+                    await asyncio.wait_for(self.trade_opened.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    pass
+                self.trade_opened.clear()
 
             except Exception as e:
-                logging.error(f"Main Loop Error: {e}")
-                import traceback
+                delay = self.loop_backoff.next_delay()
+                logging.error(f"Main Loop Error: {e} (retrying in {delay:.0f}s)")
                 traceback.print_exc()
-                await asyncio.sleep(15)
-
-    async def look_for_entry(self, df, current_price, market_settings):
-        signal, data = self.strategy.check_signal(df)
+                await asyncio.sleep(delay)
+
+    async def fetch_market_data(self, symbols):
+        """
+        Fetch candles for each symbol and the prices of all of them concurrently.
+        Prices come from a single batched ticker request instead of one per symbol.
+        Returns ({symbol: candles or None}, {symbol: price}).
+        """
+        async with asyncio.TaskGroup() as tg:
+            price_task = tg.create_task(self.exchange.get_current_prices(symbols), name="prices")
+            candle_tasks = {
+                symbol: tg.create_task(
+                    self.exchange.get_candle_arrays(symbol, limit=self.strategy.candles_needed(symbol)),
+                    name=f"candles:{symbol}"
+                )
+                for symbol in symbols
+            }
+        return {symbol: task.result() for symbol, task in candle_tasks.items()}, price_task.result()
+
+    async def update_indicators(self, symbol, candles):
+        """
+        Update the symbol's indicators with freshly fetched candles. When candles
+        were missed since the last update (the short tail no longer overlaps), the
+        state is rebuilt from a full history fetch. Returns None if that fails.
+        """
+        indicators = self.strategy.update_indicators(symbol, candles)
+        if indicators is None:
+            candles = await self.exchange.get_candle_arrays(symbol, limit=self.strategy.candles_needed(symbol))
+            if candles is None:
+                return None
+            indicators = self.strategy.update_indicators(symbol, candles)
+        return indicators
+
+    async def look_for_entry(self, indicators, current_price, market_settings):
+        signal, data = self.strategy.check_signal(indicators)
         symbol = market_settings['symbol']
 
         if signal:
-            logging.info(f"SIGNAL DETECTED ({symbol}): {signal} at {current_price}")
+            # A signal stands for the whole candle, so these logs can repeat every
+            # cycle (e.g. while in cooldown): format lazily, only if the level is on
+            logging.info("SIGNAL DETECTED (%s): %s at %s", symbol, signal, current_price)
 
             # 1. Risk Checks
             # 1.1 Check Cooldown
             if not self.risk_manager.check_cooldown(symbol):
-                logging.warning(f"Entry blocked: {symbol} is in cooldown period")
+                logging.warning("Entry blocked: %s is in cooldown period", symbol)
                 return False
 
             # 1.2 Calculate Size
@@ -210,7 +285,7 @@ class MrRobotTrade:
             # 1.3 Check Daily Loss Limit
             if not self.risk_manager.check_daily_loss(available_balance):
                 logging.critical("Entry blocked: Daily loss limit exceeded")
-                await self.send_notification("🚨 **DAILY LOSS LIMIT EXCEEDED**\nKill Switch activated.")
+                await self.send_notification(DAILY_LOSS_MESSAGE)
                 return False
 
             # Use dynamic leverage from market settings
@@ -352,6 +427,8 @@ class MrRobotTrade:
                     new_trade_obj['market_settings'] = market_settings # Ensure consistency
                     self.active_trades.append(new_trade_obj)
 
+                self.trade_opened.set()
+
                 # Notify
                 side_icon = "🟢" if signal.upper() in ['LONG', 'BUY'] else "🔴"
                 notional = float(order.get('amount', amount)) * float(order.get('average', current_price))
@@ -380,22 +457,29 @@ class MrRobotTrade:
                 return True # Signal that we entered
         return False
 
-    async def manage_trade(self, df, current_price, trade):
+    async def manage_trade(self, indicators, current_price, trade):
         symbol = trade['symbol']
         side = trade['side']
         entry_price = float(trade['entry_price'])
 
-        # PnL Calculation depending on side
-        if side == 'LONG':
-            pnl_pct = (current_price - entry_price) / entry_price
-        else: # SHORT
-            pnl_pct = (entry_price - current_price) / entry_price
-
-        # Heartbeat Log while managing
-        leverage = int(trade.get('market_settings', {}).get('leverage', 5))
-        roi_pct = pnl_pct * leverage
-        ts_status = f"{float(trade.get('strategy_data', {}).get('trailing_stop_price', 0)):.2f}" if trade.get('strategy_data', {}).get('trailing_stop_price') else "OFF"
-        logging.info(f"[{symbol} | {side}] MANAGING | Price: {current_price:.2f} | PnL: {pnl_pct*100:.2f}% | ROI: {roi_pct*100:.2f}% | TS: {ts_status}")
+        # Trade direction: +1 LONG, -1 SHORT. Multiplying prices by it turns every
+        # side-dependent check below into one comparison against a price level
+        direction = 1 if side == 'LONG' else -1
+        signed_price = direction * current_price
+
+        # Heartbeat Log while managing (same per-symbol throttle as the scan heartbeat)
+        now = time.monotonic()
+        if (logging.getLogger().isEnabledFor(logging.INFO)
+                and now - self.last_heartbeat_log.get(symbol, float('-inf')) >= HEARTBEAT_LOG_INTERVAL):
+            self.last_heartbeat_log[symbol] = now
+            pnl_pct = direction * (current_price - entry_price) / entry_price
+            leverage = int(trade.get('market_settings', {}).get('leverage', 5))
+            roi_pct = pnl_pct * leverage
+            ts_status = f"{float(trade.get('strategy_data', {}).get('trailing_stop_price', 0)):.2f}" if trade.get('strategy_data', {}).get('trailing_stop_price') else "OFF"
+            logging.info(
+                "[%s | %s] MANAGING | Price: %.2f | PnL: %.2f%% | ROI: %.2f%% | TS: %s",
+                symbol, side, current_price, pnl_pct * 100, roi_pct * 100, ts_status
+            )
 
         # 1. Recuperar Dados
         initial_stop_percent = 0.05
@@ -416,8 +500,8 @@ class MrRobotTrade:
             if 'stop_loss_price' not in strategy_data:
                 atr = float(strategy_data.get('atr', 0))
                 # Fallbacks for old trades
-                if atr == 0 and not df.empty:
-                    atr = df.iloc[-1].get('atr', 0)
+                if atr == 0 and indicators and indicators.atr:
+                    atr = indicators.atr
                 if atr == 0:
                      atr = entry_price * 0.01
                 # --- CORRECTED RISK LOGIC ---
@@ -458,23 +542,15 @@ class MrRobotTrade:
                 logging.info(f"   Final Plan | Entry: {entry_price} | Stop: {initial_stop:.4f} | TP: {take_profit:.4f}")
 
             stop_loss = strategy_data.get('stop_loss_price')
-            if stop_loss:
-                if side == 'LONG' and current_price <= stop_loss:
-                    should_exit = True
-                    exit_reason = f"ATR Stop Loss ({stop_loss:.2f})"
-                elif side == 'SHORT' and current_price >= stop_loss:
-                    should_exit = True
-                    exit_reason = f"ATR Stop Loss ({stop_loss:.2f})"
+            if stop_loss and signed_price <= direction * stop_loss:
+                should_exit = True
+                exit_reason = f"ATR Stop Loss ({stop_loss:.2f})"
 
         # 3. Take Profit Fixo (1.5x)
         take_profit = strategy_data.get('take_profit_price')
-        if take_profit:
-            if side == 'LONG' and current_price >= take_profit:
-                 should_exit = True
-                 exit_reason = f"Take Profit Target (1.5x) ({take_profit:.2f})"
-            elif side == 'SHORT' and current_price <= take_profit:
-                 should_exit = True
-                 exit_reason = f"Take Profit Target (1.5x) ({take_profit:.2f})"
+        if take_profit and signed_price >= direction * take_profit:
+            should_exit = True
+            exit_reason = f"Take Profit Target (1.5x) ({take_profit:.2f})"
 
         # 4. Trailing Stop (Breakeven)
         # Se lucrou 1x o risco, move pro zero a zero
@@ -485,28 +561,21 @@ class MrRobotTrade:
             risk_dist = abs(entry_price - stop_price)
 
             # Breakeven Move Logic
-            should_move = False
-            new_stop = 0
-
             # Only move to Breakeven if price has moved at least 0.5% in our favor
             # improving chances we don't get stopped out immediately
             min_move_pct = 0.005
 
-            if side == 'LONG':
-                 # Trigger: Entry + Risk Distance
-                 trigger_price = entry_price + risk_dist
-                 if current_price >= trigger_price and (current_price / entry_price) > (1 + min_move_pct):
-                     new_stop = entry_price * 1.002 # Set slightly above entry to cover fees
-                     should_move = True
-
-            elif side == 'SHORT':
-                 # Trigger: Entry - Risk Distance
-                 trigger_price = entry_price - risk_dist
-                 if current_price <= trigger_price and (current_price / entry_price) < (1 - min_move_pct):
-                     new_stop = entry_price * 0.998 # Set slightly below entry to cover fees
-                     should_move = True
+            # Trigger: Entry +/- Risk Distance, and past the minimum move
+            trigger_price = entry_price + direction * risk_dist
+            should_move = (
+                signed_price >= direction * trigger_price
+                and direction * (current_price - entry_price) / entry_price > min_move_pct
+            )
 
             if should_move:
+                pnl_pct = direction * (current_price - entry_price) / entry_price
+                # Set slightly past entry (above for LONG, below for SHORT) to cover fees
+                new_stop = entry_price * (1 + direction * 0.002)
                 trailing_stop_price = new_stop
                 strategy_data['trailing_stop_price'] = trailing_stop_price
                 trade['strategy_data'] = strategy_data
@@ -522,17 +591,13 @@ class MrRobotTrade:
                 logging.info(f"[{symbol}] Moved to Breakeven: {new_stop:.2f}")
 
         # Execução do Trailing Stop (se já estiver ativo)
-        if trailing_stop_price is not None:
-            if side == 'LONG' and current_price < trailing_stop_price:
-                should_exit = True
-                exit_reason = f"Trailing Stop Hit ({trailing_stop_price:.2f})"
-            elif side == 'SHORT' and current_price > trailing_stop_price:
-                should_exit = True
-                exit_reason = f"Trailing Stop Hit ({trailing_stop_price:.2f})"
+        if trailing_stop_price is not None and signed_price < direction * trailing_stop_price:
+            should_exit = True
+            exit_reason = f"Trailing Stop Hit ({trailing_stop_price:.2f})"
 
         # 4. Saída Técnica (Cruzamento de Médias)
         if not should_exit:
-            technical_exit, tech_reason = self.strategy.check_exit(df, side)
+            technical_exit, tech_reason = self.strategy.check_exit(indicators, side)
             if technical_exit:
                 should_exit = True
                 exit_reason = tech_reason
@@ -589,18 +654,12 @@ class MrRobotTrade:
                 'pnl_percentage': (pnl / (entry_price * amount)) * 100 if entry_price != 0 else 0
             }
 
-            self.db.update_trade(trade['id'], update_data)
+            await asyncio.to_thread(self.db.update_trade, trade['id'], update_data)
 
-            # 5. Update/Log Balance
-            if Config.TRADING_MODE == 'PAPER':
-                await self.exchange.update_paper_balance(pnl)
-            else:
-                new_bal = await self.exchange.get_balance()
-                self.db.log_wallet({
-                    'total_balance': float(new_bal['total']),
-                    'available_balance': float(new_bal['free']),
-                    'mode': 'LIVE'
-                })
+            # 5. Update/Log Balance: batched by the main loop after the manage step,
+            # so several closes in one pass cost a single wallet write
+            self.unlogged_close_pnl.append(pnl)
+            self.risk_manager.set_trade_cooldown(symbol)
 
             logging.info(f"Trade CLOSED. PnL: {pnl:.2f} USDT")
 
@@ -624,7 +683,21 @@ class MrRobotTrade:
         except Exception as e:
             logging.error(f"Error in close_trade process: {e}")
 
+    async def log_balance_after_close(self, pnl):
+        """Record the wallet balance after trades close (pnl is their combined PnL)."""
+        if Config.TRADING_MODE == 'PAPER':
+            await self.exchange.update_paper_balance(pnl)
+        else:
+            new_bal = await self.exchange.get_balance()
+            await asyncio.to_thread(self.db.log_wallet, {
+                'total_balance': float(new_bal['total']),
+                'available_balance': float(new_bal['free']),
+                'mode': 'LIVE'
+            })
+
 if __name__ == "__main__":
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     bot = MrRobotTrade()
     loop = asyncio.get_event_loop()
     try:
@@ -632,4 +705,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logging.info("Stopping Bot...")
     finally:
-        loop.run_until_complete(bot.exchange.close())
+        loop.run_until_complete(bot.close())
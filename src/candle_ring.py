@@ -0,0 +1,63 @@
+import numpy as np
+
+CANDLE_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+class CandleRing:
+    """
+    Fixed-capacity OHLCV ring buffer.
+
+    Candles live in a preallocated float64 array with one contiguous row per
+    OHLCV field (structure of arrays). Appending or updating the still-open
+    candle never allocates; memory is only copied when view() is called.
+    """
+    __slots__ = ('capacity', 'buf', 'head', 'n')
+
+    def __init__(self, capacity: int = 300):
+        self.capacity = capacity
+        self.buf = np.zeros((len(CANDLE_FIELDS), capacity), dtype=np.float64)
+        self.head = 0  # Next write position
+        self.n = 0     # Number of valid candles
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def last_timestamp(self):
+        """Open time (ms) of the newest candle, or None if empty."""
+        if self.n == 0:
+            return None
+        return int(self.buf[0, (self.head - 1) % self.capacity])
+
+    def append(self, candle):
+        """Append a new candle, evicting the oldest one when full."""
+        self.buf[:, self.head] = candle
+        self.head = (self.head + 1) % self.capacity
+        self.n = min(self.n + 1, self.capacity)
+
+    def update_last(self, candle):
+        """Overwrite the newest candle in place (still-open candle update)."""
+        self.buf[:, (self.head - 1) % self.capacity] = candle
+
+    def push(self, candle):
+        """Append a candle, or update the newest one if it has the same open time. Older candles are ignored."""
+        last_ts = self.last_timestamp
+        if last_ts is not None:
+            if candle[0] == last_ts:
+                self.update_last(candle)
+                return
+            if candle[0] < last_ts:
+                return
+        self.append(candle)
+
+    def view(self, limit: int = None) -> dict:
+        """
+        Return the newest `limit` candles (all by default) as a dict of contiguous
+        numpy arrays, one per OHLCV field, oldest first.
+        """
+        m = self.n if limit is None else min(self.n, limit)
+        start = (self.head - m) % self.capacity
+        if start + m <= self.capacity:
+            block = self.buf[:, start:start + m].copy()
+        else:
+            block = np.concatenate((self.buf[:, start:], self.buf[:, :self.head]), axis=1)
+        return {field: block[i] for i, field in enumerate(CANDLE_FIELDS)}
@@ -1,9 +1,15 @@
 import ccxt.async_support as ccxt
 import logging
 import asyncio
-from datetime import datetime
+import itertools
+import time
+import numpy as np
 from src.config import Config
 from src.database import Database
+from src.candle_ring import CandleRing, CANDLE_FIELDS
+
+# Number of candles kept in memory per (symbol, timeframe)
+CANDLE_CACHE_SIZE = 300
 
 class Exchange:
     def __init__(self):
@@ -26,6 +32,13 @@ class Exchange:
         self.client = ccxt.binance(exchange_config)
         self.paper_balance = self._init_paper_balance()
 
+        # Paper order ids: increasing integers seeded with the start time (ms), so they
+        # stay unique within a run (even several orders per second) and across restarts
+        self._paper_order_ids = itertools.count(int(time.time() * 1000))
+
+        # Candle ring buffers: {(symbol, timeframe): CandleRing}
+        self.candles_cache = {}
+
     def _init_paper_balance(self):
         """Initialize balance logging and paper values."""
         if self.mode == 'PAPER':
@@ -46,16 +59,53 @@ class Exchange:
     async def close(self):
         await self.client.close()
 
-    async def get_candles(self, symbol, limit=300, timeframe=None):
-        """ALWAYS fetch real market data. Uses bot's default timeframe unless specified."""
+    async def get_candle_arrays(self, symbol, limit=300, timeframe=None):
+        """
+        ALWAYS fetch real market data. Uses bot's default timeframe unless specified.
+        Returns the candles as a dict of contiguous float64 numpy arrays (one per
+        OHLCV field, oldest first).
+
+        Candles are kept in a preallocated ring buffer per (symbol, timeframe), so after
+        the first call only the candles since the last cached one are downloaded.
+        """
         try:
             tf = timeframe if timeframe else self.timeframe
-            ohlcv = await self.client.fetch_ohlcv(symbol, tf, limit=limit)
-            return ohlcv
+            if limit > CANDLE_CACHE_SIZE:
+                ohlcv = await self.client.fetch_ohlcv(symbol, tf, limit=limit)
+                if not ohlcv:
+                    return None
+                columns = np.asarray(ohlcv, dtype=np.float64).T
+                return {field: np.ascontiguousarray(columns[i]) for i, field in enumerate(CANDLE_FIELDS)}
+
+            key = (symbol, tf)
+            ring = self.candles_cache.get(key)
+            if ring is not None and len(ring) > 0:
+                ohlcv = await self.client.fetch_ohlcv(symbol, tf, since=ring.last_timestamp, limit=CANDLE_CACHE_SIZE)
+                if ohlcv and len(ohlcv) < CANDLE_CACHE_SIZE:
+                    for candle in ohlcv:
+                        ring.push(candle)
+                else:
+                    # Gap too large (or empty answer): rebuild the buffer from scratch
+                    ring = await self._reset_candles(key, symbol, tf)
+            else:
+                ring = await self._reset_candles(key, symbol, tf)
+
+            if len(ring) == 0:
+                return None
+            return ring.view(limit)
         except Exception as e:
             logging.error(f"Error fetching candles for {symbol}: {e}")
             return None
 
+    async def _reset_candles(self, key, symbol, tf):
+        """Fill the ring buffer for (symbol, timeframe) with a full history fetch."""
+        ohlcv = await self.client.fetch_ohlcv(symbol, tf, limit=CANDLE_CACHE_SIZE)
+        ring = CandleRing(CANDLE_CACHE_SIZE)
+        for candle in ohlcv or []:
+            ring.push(candle)
+        self.candles_cache[key] = ring
+        return ring
+
     async def get_current_price(self, symbol):
         """ALWAYS fetch real market price."""
         try:
@@ -65,6 +115,53 @@ class Exchange:
             logging.error(f"Error fetching price for {symbol}: {e}")
             return None
 
+    async def get_current_prices(self, symbols):
+        """
+        ALWAYS fetch real market prices for several symbols with a single request.
+        Returns {symbol: last price}; symbols that failed are missing.
+        Symbols the batch could not price (unknown symbol, failed request) fall
+        back to one get_current_price call each, so one bad symbol never hides the rest.
+        """
+        # Tickers are keyed by the unified symbol (e.g. 'BTC/USDT:USDT' for futures).
+        # Resolving it needs the market list, which PAPER mode never loads otherwise
+        try:
+            await self.client.load_markets()
+        except Exception as e:
+            logging.error(f"Error loading markets: {e}")
+
+        unified = {}
+        for symbol in symbols:
+            try:
+                unified[symbol] = self.client.market(symbol)['symbol']
+            except Exception as e:
+                logging.error(f"Error resolving market for {symbol}: {e}")
+
+        prices = {}
+        if unified:
+            try:
+                if self.client.has.get('fetchLastPrices'):
+                    # Price-only endpoint: a few fields per symbol instead of full 24h tickers
+                    tickers = await self.client.fetch_last_prices(list(unified))
+                    field = 'price'
+                else:
+                    tickers = await self.client.fetch_tickers(list(unified))
+                    field = 'last'
+
+                for symbol, market_symbol in unified.items():
+                    ticker = tickers.get(market_symbol) or tickers.get(symbol)
+                    if ticker and ticker.get(field) is not None:
+                        prices[symbol] = ticker[field]
+            except Exception as e:
+                logging.error(f"Error fetching prices for {list(unified)}: {e}")
+
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            results = await asyncio.gather(*(self.get_current_price(symbol) for symbol in missing))
+            for symbol, price in zip(missing, results):
+                if price is not None:
+                    prices[symbol] = price
+        return prices
+
     async def get_balance(self):
         """Hybrid Balance Fetching."""
         if self.mode == 'LIVE':
@@ -134,7 +231,7 @@ class Exchange:
 
             # Create a fake order object structure similar to CCXT
             fake_order = {
-                'id': f'paper_{int(datetime.now().timestamp())}',
+                'id': f'paper_{next(self._paper_order_ids)}',
                 'symbol': symbol,
                 'side': side.lower(),
                 'type': 'market',
@@ -142,7 +239,7 @@ class Exchange:
                 'price': current_price, # Market fill assumption
                 'average': current_price,
                 'status': 'closed',
-                'timestamp': int(datetime.now().timestamp() * 1000),
+                'timestamp': int(time.time() * 1000),
                 'info': {'msg': 'Simulated Order'}
             }
             return fake_order
@@ -171,7 +268,8 @@ class Exchange:
         """Update internal paper balance after a trade close."""
         if self.mode == 'PAPER':
             self.paper_balance += pnl
-            self.db.log_wallet({
+            # Supabase client is synchronous: run the insert in a worker thread
+            await asyncio.to_thread(self.db.log_wallet, {
                 'total_balance': self.paper_balance,
                 'available_balance': self.paper_balance,
                 'mode': 'PAPER'
@@ -232,14 +330,14 @@ class Exchange:
             logging.info(f"[PAPER LIMIT] {ccxt_side.upper()} {amount} {symbol} @ ${price}")
 
             fake_order = {
-                'id': f'paper_limit_{int(datetime.now().timestamp())}',
+                'id': f'paper_limit_{next(self._paper_order_ids)}',
                 'symbol': symbol,
                 'side': ccxt_side,
                 'type': 'limit',
                 'amount': amount,
                 'price': price,
                 'status': 'open',  # Limit orders start as 'open'
-                'timestamp': int(datetime.now().timestamp() * 1000),
+                'timestamp': int(time.time() * 1000),
                 'info': {'msg': 'Simulated Limit Order'}
             }
             return fake_order
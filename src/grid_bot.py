@@ -6,10 +6,17 @@ from src.database import Database
 from src.grid_strategy import GridStrategy
 from src.risk_manager import RiskManager
 from src.logger_handler import SupabaseHandler
-from datetime import datetime
-from telegram import Bot
-from telegram.error import TelegramError
+from src.backoff import Backoff, SymbolBreaker
+from src.notifier import TelegramNotifier, KILL_SWITCH_MESSAGE
 import uuid
+import time
+import traceback
+import numpy as np
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
 
 # Configure Logging
 logging.basicConfig(
@@ -22,6 +29,25 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("postgrest").setLevel(logging.WARNING)
 
+# Pause between monitor passes (each pass visits every active market once)
+MONITOR_INTERVAL = 60  # seconds
+
+# Oldest batched price (seconds) monitor_grid may act on; the 2s pause between
+# symbols means a batch is refetched every few grids
+MAX_PRICE_AGE = 5
+
+# Per-symbol circuit breaker: after this many consecutive failures a symbol is
+# skipped for SYMBOL_BREAKER_COOLDOWN seconds
+MAX_SYMBOL_FAILURES = 5
+SYMBOL_BREAKER_COOLDOWN = 300
+
+# Grid settings come from the environment and never change at runtime
+GRID_SETTINGS_SUMMARY = (
+    f"📊 **Grid Levels:** {Config.GRID_LEVELS}\n"
+    f"📏 **Spacing:** {float(Config.GRID_SPACING_PCT)*100:.2f}%\n"
+    f"🎯 **Profit Target:** {float(Config.GRID_PROFIT_PCT)*100:.2f}%"
+)
+
 class GridTradingBot:
     def __init__(self):
         self.exchange = Exchange()
@@ -34,29 +60,80 @@ class GridTradingBot:
         self.risk_manager = RiskManager()
         self.running = True
 
+        # Numeric grid settings, parsed once (Config keeps them as env strings)
+        self.max_positions = int(Config.GRID_LEVELS)
+        self.capital_per_level = float(Config.CAPITAL_PER_GRID)
+
         # Grid state tracking
-        self.active_grids = {}  # {symbol: {'range': (low, high), 'levels': [...], 'last_rebalance': timestamp}}
+        self.active_grids = {}  # {symbol: {'range': (low, high), 'levels': [...], 'last_rebalance': monotonic time}}
         self.pending_orders = {}  # {order_id: order_data}
+        self.orders_by_symbol = {}  # {symbol: {order_id: order_data}}, same objects as pending_orders
         self.completed_cycles = []  # Track completed buy-sell cycles
 
-        self.last_sync_time = 0
+        self.last_sync_time = None  # time.monotonic() of the last orphan sync
+
+        # Failure tracking (jittered backoff + per-symbol circuit breaker)
+        self.loop_backoff = Backoff(base=60, cap=300)
+        self.symbol_health = SymbolBreaker(MONITOR_INTERVAL, MAX_SYMBOL_FAILURES, SYMBOL_BREAKER_COOLDOWN)
 
-        self.tg_bot = None
+        self.notifier = TelegramNotifier()
 
         # Add Supabase Error Handler
         db_handler = SupabaseHandler(self.db)
         logging.getLogger().addHandler(db_handler)
 
-        if Config.TELEGRAM_BOT_TOKEN:
-            self.tg_bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
-
     async def send_notification(self, message):
-        """Send message to Telegram."""
-        if self.tg_bot and Config.TELEGRAM_CHAT_ID:
+        """Send message to Telegram without blocking the trading loop."""
+        self.notifier.notify(message)
+
+    async def close(self):
+        """Release the exchange and Telegram HTTP connections."""
+        await self.exchange.close()
+        await self.notifier.close()
+
+    def _track_order(self, order_id, order_data):
+        """Track a pending order by id and in its symbol's index."""
+        self.pending_orders[order_id] = order_data
+        self.orders_by_symbol.setdefault(order_data['symbol'], {})[order_id] = order_data
+
+    def _untrack_order(self, order_id):
+        """Stop tracking a pending order."""
+        order_data = self.pending_orders.pop(order_id, None)
+        if order_data is None:
+            return
+        symbol_orders = self.orders_by_symbol.get(order_data['symbol'])
+        if symbol_orders is not None:
+            symbol_orders.pop(order_id, None)
+            if not symbol_orders:
+                del self.orders_by_symbol[order_data['symbol']]
+
+    def _untrack_buy_orders(self, symbol):
+        """Stop tracking a symbol's BUY orders (SELLs/TPs are kept)."""
+        for order_id, order_data in list(self.orders_by_symbol.get(symbol, {}).items()):
+            if order_data['order']['side'].upper() == 'BUY':
+                self._untrack_order(order_id)
+
+    def _symbol_orders(self, symbol):
+        """Pending orders of one symbol, without scanning every tracked order."""
+        return list(self.orders_by_symbol.get(symbol, {}).values())
+
+    async def _sync_symbol_orders(self, symbol):
+        """
+        Pending orders of a symbol. If none are tracked (e.g. after a restart),
+        adopt the symbol's open orders from the exchange first.
+        """
+        symbol_orders = self._symbol_orders(symbol)
+        if not symbol_orders:
             try:
-                await self.tg_bot.send_message(chat_id=Config.TELEGRAM_CHAT_ID, text=message)
-            except TelegramError as e:
-                logging.error(f"Telegram Error: {e}")
+                open_orders = await self.exchange.get_open_orders(symbol)
+                if open_orders:
+                    for order in open_orders:
+                        if order['id'] not in self.pending_orders:
+                            self._track_order(order['id'], {'symbol': symbol, 'order': order, 'grid_cycle_id': None})
+                    symbol_orders = self._symbol_orders(symbol)
+            except Exception as e:
+                logging.error(f'Error syncing {symbol}: {e}')
+        return symbol_orders
 
     async def check_btc_trend(self) -> bool:
         """
@@ -71,14 +148,14 @@ class GridTradingBot:
             btc_symbol = 'BTC/USDT'
             limit = 2  # Current + 1 previous candle
 
-            candles = await self.exchange.get_candles(btc_symbol, limit=limit, timeframe=Config.BTC_FILTER_TIMEFRAME)
-            if not candles or len(candles) < 2:
+            candles = await self.exchange.get_candle_arrays(btc_symbol, limit=limit, timeframe=Config.BTC_FILTER_TIMEFRAME)
+            if candles is None or len(candles['close']) < 2:
                 logging.warning("[BTC FILTER] Could not fetch BTC data, allowing trades (fail-safe)")
                 return True
 
             # Calculate price change
-            previous_close = candles[-2][4]  # Close of previous candle
-            current_close = candles[-1][4]   # Close of current candle
+            previous_close = float(candles['close'][-2])  # Close of previous candle
+            current_close = float(candles['close'][-1])   # Close of current candle
 
             price_change_pct = ((current_close - previous_close) / previous_close)
 
@@ -97,38 +174,36 @@ class GridTradingBot:
                 return False
 
             # All good
-            logging.info(f"[BTC FILTER] BTC trend OK ({price_change_pct*100:+.2f}%)")
+            logging.info("[BTC FILTER] BTC trend OK (%+.2f%%)", price_change_pct * 100)
             return True
 
         except Exception as e:
             logging.error(f"[BTC FILTER] Error checking BTC trend: {e}")
             return True  # Fail-safe: allow trading if check fails
 
-    def calculate_rsi(self, candles, period=14):
+    def calculate_rsi(self, closes, period=14):
         """
-        Calculate RSI (Relative Strength Index) manually
+        Calculate RSI (Relative Strength Index) manually from an array of close prices
         """
         try:
-            closes = [float(c[4]) for c in candles]  # Close prices
-
             if len(closes) < period + 1:
                 return None
 
             # Calculate price changes
-            deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
+            deltas = np.diff(closes)
 
             # Separate gains and losses
-            gains = [d if d > 0 else 0 for d in deltas]
-            losses = [-d if d < 0 else 0 for d in deltas]
+            gains = np.clip(deltas, 0, None)
+            losses = np.clip(-deltas, 0, None)
 
             # Calculate average gain/loss (using EMA for standard RSI)
-            avg_gain = sum(gains[:period]) / period
-            avg_loss = sum(losses[:period]) / period
+            avg_gain = float(gains[:period].mean())
+            avg_loss = float(losses[:period].mean())
 
             # Calculate RSI using first smoothed values
-            for i in range(period, len(gains)):
-                avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-                avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+            for gain, loss in zip(gains[period:].tolist(), losses[period:].tolist()):
+                avg_gain = (avg_gain * (period - 1) + gain) / period
+                avg_loss = (avg_loss * (period - 1) + loss) / period
 
             if avg_loss == 0:
                 return 100  # No losses = maximum RSI
@@ -155,13 +230,13 @@ class GridTradingBot:
             # Need period + 1 candles minimum
             limit = Config.RSI_FILTER_PERIOD + 10  # Extra buffer
 
-            candles = await self.exchange.get_candles(symbol, limit=limit, timeframe=Config.RSI_FILTER_TIMEFRAME)
-            if not candles or len(candles) < Config.RSI_FILTER_PERIOD + 1:
+            candles = await self.exchange.get_candle_arrays(symbol, limit=limit, timeframe=Config.RSI_FILTER_TIMEFRAME)
+            if candles is None or len(candles['close']) < Config.RSI_FILTER_PERIOD + 1:
                 logging.warning(f"[RSI FILTER] Could not fetch enough data for {symbol}, allowing trades (fail-safe)")
                 return True
 
             # Calculate RSI
-            rsi = self.calculate_rsi(candles, period=Config.RSI_FILTER_PERIOD)
+            rsi = self.calculate_rsi(candles['close'], period=Config.RSI_FILTER_PERIOD)
 
             if rsi is None:
                 logging.warning(f"[RSI FILTER] Could not calculate RSI for {symbol}, allowing trades (fail-safe)")
@@ -186,7 +261,7 @@ class GridTradingBot:
 
 
             # RSI in healthy zone - good to buy
-            logging.info(f"[RSI FILTER] {symbol} RSI in buy zone ({rsi:.1f}) - Healthy entry")
+            logging.info("[RSI FILTER] %s RSI in buy zone (%.1f) - Healthy entry", symbol, rsi)
             return True
 
         except Exception as e:
@@ -194,14 +269,19 @@ class GridTradingBot:
             return True  # Fail-safe: allow trading if check fails
 
 
+    def _update_symbol_health(self, symbol: str, ok: bool):
+        """Track consecutive failures per symbol (see SymbolBreaker)."""
+        if self.symbol_health.record(symbol, ok):
+            logging.warning(f"[BREAKER] {symbol} failed {MAX_SYMBOL_FAILURES + 1} times in a row. Pausing it for {SYMBOL_BREAKER_COOLDOWN}s.")
+
     async def sync_orphaned_orders(self):
         """
         Sync DB OPEN trades with Exchange Open Orders to detect and close orphans.
         Runs every 15 minutes.
         """
         try:
-            now = datetime.now().timestamp()
-            if now - self.last_sync_time < 900: # 15 min
+            now = time.monotonic()
+            if self.last_sync_time is not None and now - self.last_sync_time < 900: # 15 min
                 return
 
             logging.info("[SYNC] Starting Orphan Check...")
@@ -278,9 +358,7 @@ class GridTradingBot:
             f"🤖 **Grid Trading Bot Iniciado v3.0**\n\n"
             f"📍 **Modo:** {Config.TRADING_MODE}\n"
             f"💵 **Saldo Inicial:** ${total_balance:,.2f} USDT\n"
-            f"📊 **Grid Levels:** {Config.GRID_LEVELS}\n"
-            f"📏 **Spacing:** {float(Config.GRID_SPACING_PCT)*100:.2f}%\n"
-            f"🎯 **Profit Target:** {float(Config.GRID_PROFIT_PCT)*100:.2f}%"
+            + GRID_SETTINGS_SUMMARY
         )
         logging.info(f"Starting Grid Trading Bot [{Config.TRADING_MODE}] - Balance: ${total_balance:.2f}")
         await self.send_notification(start_msg)
@@ -290,7 +368,7 @@ class GridTradingBot:
                 # 0. Check Kill Switch
                 if not self.risk_manager.check_kill_switch():
                     logging.critical("🚨 System halted by Kill Switch")
-                    await self.send_notification("🚨 **KILL SWITCH ACTIVATED**\nTrading halted for safety.")
+                    await self.send_notification(KILL_SWITCH_MESSAGE)
                     await asyncio.sleep(300)
                     continue
 
@@ -315,52 +393,62 @@ class GridTradingBot:
                     await asyncio.sleep(60)
                     continue
 
+                # Grid prices are fetched in one request for every grid still to visit,
+                # and refetched once they are older than MAX_PRICE_AGE
+                prices = {}
+                prices_at = float('-inf')
+
                 # 2. For each market, manage grid
-                for market in active_markets:
+                self.symbol_health.start_pass()
+                for i, market in enumerate(active_markets):
                     symbol = market['symbol']
                     stop_buy = market.get('stop_buy', False)
 
+                    # Skip symbols that are backing off after failures
+                    if self.symbol_health.should_skip(symbol):
+                        continue
+
                     # Check if grid exists for this symbol
                     if symbol not in self.active_grids:
                         # Check if manual stop_buy is enabled
                         if stop_buy:
                             # Count remaining sells
-                            symbol_orders = [o for o in self.pending_orders.values() if o['symbol'] == symbol]
-                            if not symbol_orders:
-                                try:
-                                    open_orders = await self.exchange.get_open_orders(symbol)
-                                    if open_orders:
-                                        for order in open_orders:
-                                            if order['id'] not in self.pending_orders:
-                                                self.pending_orders[order['id']] = {'symbol': symbol, 'order': order, 'grid_cycle_id': None}
-                                        symbol_orders = [o for o in self.pending_orders.values() if o['symbol'] == symbol]
-                                except Exception as e: logging.error(f'Error syncing {symbol}: {e}')
-                            active_sells = len([o for o in symbol_orders if o['order']['side'].lower() == 'sell'])
-
-                            logging.info(f"[STOP BUY] {symbol} (stop_buy=true). Monitoring {active_sells} existing sells. No new grids.")
+                            symbol_orders = await self._sync_symbol_orders(symbol)
+                            if logging.getLogger().isEnabledFor(logging.INFO):
+                                active_sells = sum(1 for o in symbol_orders if o['order']['side'].lower() == 'sell')
+                                logging.info("[STOP BUY] %s (stop_buy=true). Monitoring %d existing sells. No new grids.", symbol, active_sells)
+
                             # Continue to next symbol (won't create new buy orders)
                             continue
                         # Setup new grid (normal flow)
-                        await self.setup_grid(symbol, market)
+                        ok = await self.setup_grid(symbol, market)
                     else:
                         # Monitor existing grid (sells continue working)
-                        await self.monitor_grid(symbol, market)
+                        if time.monotonic() - prices_at > MAX_PRICE_AGE:
+                            prices = await self.exchange.get_current_prices(
+                                [m['symbol'] for m in active_markets[i:] if m['symbol'] in self.active_grids]
+                            )
+                            prices_at = time.monotonic()
+                        ok = await self.monitor_grid(symbol, market, current_price=prices.get(symbol))
+                    self._update_symbol_health(symbol, ok)
 
                     # Small delay between symbols
                     await asyncio.sleep(2)
 
+                self.loop_backoff.reset()
+
                 # 3. Check for rebalancing every hour
-                await asyncio.sleep(60)  # Main loop delay
+                await asyncio.sleep(MONITOR_INTERVAL)  # Main loop delay
 
             except Exception as e:
                 logging.error(f"Main Loop Error: {e}")
-                import traceback
                 traceback.print_exc()
-                await asyncio.sleep(60)
+                await asyncio.sleep(self.loop_backoff.next_delay())
 
-    async def setup_grid(self, symbol: str, market_settings: dict):
+    async def setup_grid(self, symbol: str, market_settings: dict) -> bool:
         """
         Create initial grid for a symbol
+        Returns False if the setup failed (exchange/data error).
         """
         try:
             logging.info(f"[GRID SETUP] Initializing grid for {symbol}")
@@ -369,10 +457,10 @@ class GridTradingBot:
             await self.exchange.set_margin_type(symbol, 'ISOLATED')
 
             # Fetch candles for range calculation
-            candles = await self.exchange.get_candles(symbol, limit=96)  # 24h of 15m candles (96 * 15m = 24h)
-            if not candles:
+            candles = await self.exchange.get_candle_arrays(symbol, limit=96)  # 24h of 15m candles (96 * 15m = 24h)
+            if candles is None:
                 logging.error(f"[GRID SETUP] Failed to fetch candles for {symbol}")
-                return
+                return False
 
             # Set leverage for this symbol (Binance stores leverage per-pair)
             # This ensures all new orders use the configured leverage from database
@@ -408,13 +496,13 @@ class GridTradingBot:
 
                      if order:
                          # Add to tracking
-                         self.pending_orders[str(sell_order_id)] = {
+                         self._track_order(str(sell_order_id), {
                              'symbol': symbol,
                              'level': strategy_data.get('grid_level'),
                              'order': order,
                              'grid_cycle_id': strategy_data.get('grid_cycle_id'),
                              'entry_price': float(trade['entry_price'])
-                         }
+                         })
                          restored_count += 1
 
             if restored_count > 0:
@@ -429,7 +517,7 @@ class GridTradingBot:
 
             # Calculate capital per level
             # Divide available balance by number of symbols and grid levels
-            capital_per_level = float(Config.CAPITAL_PER_GRID)
+            capital_per_level = self.capital_per_level
 
             # Generate grid levels
             grid_levels = self.grid_strategy.generate_grid_levels(
@@ -441,7 +529,7 @@ class GridTradingBot:
                 'range': (range_low, range_high),
                 'mid_price': mid_price, # Store for deviation check
                 'levels': grid_levels,
-                'last_rebalance': datetime.now(),
+                'last_rebalance': time.monotonic(),
                 'market_settings': market_settings
             }
 
@@ -451,27 +539,28 @@ class GridTradingBot:
 
             # Check for existing open positions (filled Buy orders)
             open_trades_count = self.db.get_open_trades_count(symbol)
-            allowed_new_buys = max(0, int(Config.GRID_LEVELS) - open_trades_count)
+            allowed_new_buys = max(0, self.max_positions - open_trades_count)
 
             logging.info(f"[GRID SETUP] {symbol}: existing open positions={open_trades_count}, allowed new buys={allowed_new_buys}")
 
             if allowed_new_buys == 0:
-                 logging.warning(f"[GRID SETUP] {symbol} has reached max positions ({open_trades_count}/{Config.GRID_LEVELS}). No new BUY orders will be placed.")
+                 logging.warning(f"[GRID SETUP] {symbol} has reached max positions ({open_trades_count}/{self.max_positions}). No new BUY orders will be placed.")
 
-            # BTC Crash Protection: Don't create new buys if BTC is crashing
             if allowed_new_buys > 0:
-                btc_ok = await self.check_btc_trend()
+                # Both filters fetch their own candles: run them concurrently
+                btc_ok, rsi_ok = await asyncio.gather(self.check_btc_trend(), self.check_rsi_filter(symbol))
+
+                # BTC Crash Protection: Don't create new buys if BTC is crashing
                 if not btc_ok:
                     logging.warning(f"[GRID SETUP] Skipping new BUY orders for {symbol} due to BTC crash protection")
                     logging.info(f"[GRID SETUP] Grid updated for {symbol} (Monitoring Only - BTC crash protection active)")
-                    return
+                    return True
 
                 # RSI Overbought Protection: Don't create new buys if symbol is overbought
-                rsi_ok = await self.check_rsi_filter(symbol)
                 if not rsi_ok:
                     logging.warning(f"[GRID SETUP] Skipping new BUY orders for {symbol} due to RSI overbought protection")
                     logging.info(f"[GRID SETUP] Grid updated for {symbol} (Monitoring Only - RSI overbought protection active)")
-                    return
+                    return True
 
 
             current_price = await self.exchange.get_current_price(symbol)
@@ -499,12 +588,12 @@ class GridTradingBot:
 
                     if order:
                         grid_cycle_id = str(uuid.uuid4())
-                        self.pending_orders[order['id']] = {
+                        self._track_order(order['id'], {
                             'symbol': symbol,
                             'level': level['level'],
                             'order': order,
                             'grid_cycle_id': grid_cycle_id
-                        }
+                        })
 
                         # Save to database (Best effort)
                         try:
@@ -540,35 +629,30 @@ class GridTradingBot:
                 logging.info(f"[GRID SETUP] Grid created for {symbol} with {created_buys} new BUY orders")
             else:
                 # Log internally but don't annoy the user
-                logging.info(f"[GRID SETUP] Grid updated for {symbol} (Monitoring Only - {open_trades_count}/{Config.GRID_LEVELS} positions filled)")
+                logging.info(f"[GRID SETUP] Grid updated for {symbol} (Monitoring Only - {open_trades_count}/{self.max_positions} positions filled)")
+
+            return True
 
         except Exception as e:
             logging.error(f"[GRID SETUP] Error setting up grid for {symbol}: {e}")
-            import traceback
             traceback.print_exc()
+            return False
 
-    async def monitor_grid(self, symbol: str, market_settings: dict):
+    async def monitor_grid(self, symbol: str, market_settings: dict, current_price: float = None) -> bool:
         """
         Monitor grid orders and create opposite orders when filled
+        current_price comes from the batched price fetch; it is fetched here if missing.
+        Returns False if monitoring failed (exchange/data error).
         """
         try:
             # Check if stop_buy is enabled for this symbol
             stop_buy = market_settings.get('stop_buy', False)
             if stop_buy:
                 # Count remaining sells
-                symbol_orders = [o for o in self.pending_orders.values() if o['symbol'] == symbol]
-                if not symbol_orders:
-                    try:
-                        open_orders = await self.exchange.get_open_orders(symbol)
-                        if open_orders:
-                            for order in open_orders:
-                                if order['id'] not in self.pending_orders:
-                                    self.pending_orders[order['id']] = {'symbol': symbol, 'order': order, 'grid_cycle_id': None}
-                            symbol_orders = [o for o in self.pending_orders.values() if o['symbol'] == symbol]
-                    except Exception as e: logging.error(f'Error syncing {symbol}: {e}')
-                active_sells = len([o for o in symbol_orders if o['order']['side'].lower() == 'sell'])
-
-                logging.info(f"[STOP BUY] {symbol} (stop_buy=true). Monitoring {active_sells} existing sells. No new buys.")
+                symbol_orders = await self._sync_symbol_orders(symbol)
+                if logging.getLogger().isEnabledFor(logging.INFO):
+                    active_sells = sum(1 for o in symbol_orders if o['order']['side'].lower() == 'sell')
+                    logging.info("[STOP BUY] %s (stop_buy=true). Monitoring %d existing sells. No new buys.", symbol, active_sells)
 
                 # 1. Cancel BUY orders on exchange
                 await self.exchange.cancel_all_orders(symbol, side='BUY')
@@ -577,22 +661,20 @@ class GridTradingBot:
                 self.db.cancel_pending_trades(symbol)
 
                 # 3. Clear BUY orders from local tracking (keep SELLs)
-                self.pending_orders = {
-                    k: v for k, v in self.pending_orders.items()
-                    if v['symbol'] != symbol or v['order']['side'].upper() != 'BUY'
-                }
+                self._untrack_buy_orders(symbol)
 
                 # 4. Remove from active_grids to prevent new buy orders
                 if symbol in self.active_grids:
                     del self.active_grids[symbol]
 
-                return  # Exit early, only existing sells will be monitored via pending_orders
+                return True  # Exit early, only existing sells will be monitored via pending_orders
 
             grid_data = self.active_grids[symbol]
-            current_price = await self.exchange.get_current_price(symbol)
+            if current_price is None:
+                current_price = await self.exchange.get_current_price(symbol)
 
             if not current_price:
-                return
+                return False
 
             # PRIORITY CHECK: Dynamic Range Stop (5% below range_low)
             # This triggers recalculation without closing positions
@@ -617,14 +699,11 @@ class GridTradingBot:
                 await self.exchange.cancel_all_orders(symbol, side='BUY')
 
                 # 3. Clear pending BUY orders from tracking
-                self.pending_orders = {
-                    k: v for k, v in self.pending_orders.items()
-                    if v['symbol'] != symbol or v['order']['side'].upper() != 'BUY'
-                }
+                self._untrack_buy_orders(symbol)
 
                 # 4. Remove from active grids (will trigger re-setup with new range)
                 del self.active_grids[symbol]
-                return
+                return True
 
             # Check if rebalancing needed (normal drift)
             if self.grid_strategy.should_rebalance(
@@ -642,17 +721,12 @@ class GridTradingBot:
                 # 3. Clear pending orders tracking locally
                 # We need to filter out orders that were kept (if any) or just clear all BUYs
                 # Since we only cancelled BUY orders, we must preserve SELL (TP) orders in our tracker
-                self.pending_orders = {
-                    k: v for k, v in self.pending_orders.items()
-                    if v['symbol'] != symbol or v['order']['side'].upper() != 'BUY'
-                }
+                self._untrack_buy_orders(symbol)
 
                 # 4. Remove from active grids (will trigger re-setup in next loop)
                 del self.active_grids[symbol]
-                return
-
+                return True
 
-            # Check open orders (in LIVE mode)
 
             # Check open orders (in LIVE mode)
             if Config.TRADING_MODE == 'LIVE':
@@ -660,49 +734,42 @@ class GridTradingBot:
 
                 if open_orders is None:
                     logging.warning(f"[GRID] Failed to fetch open orders for {symbol}. Skipping cycle.")
-                    return
+                    return False
 
                 # Compare with pending orders to find filled ones
                 open_order_ids = {order['id'] for order in open_orders}
 
-                for order_id, order_data in list(self.pending_orders.items()):
-                    if order_data['symbol'] != symbol:
-                        continue
-
+                for order_id, order_data in list(self.orders_by_symbol.get(symbol, {}).items()):
                     # If order not in open orders, it was filled
                     if order_id not in open_order_ids:
                         logging.info(f"[GRID] Order filled: {order_id}")
                         await self.handle_filled_order(order_data)
-                        del self.pending_orders[order_id]
+                        self._untrack_order(order_id)
 
             # In PAPER mode, we'd simulate fills based on price crossing levels
             # For now, just log monitoring
             # Calculate metrics for logging
-            symbol_orders = [o for o in self.pending_orders.values() if o['symbol'] == symbol]
-            if not symbol_orders:
-                try:
-                    open_orders = await self.exchange.get_open_orders(symbol)
-                    if open_orders:
-                        for order in open_orders:
-                            if order['id'] not in self.pending_orders:
-                                self.pending_orders[order['id']] = {'symbol': symbol, 'order': order, 'grid_cycle_id': None}
-                        symbol_orders = [o for o in self.pending_orders.values() if o['symbol'] == symbol]
-                except Exception as e: logging.error(f'Error syncing {symbol}: {e}')
-            active_buys = len([o for o in symbol_orders if o['order']['side'].lower() == 'buy'])
-            active_sells = len([o for o in symbol_orders if o['order']['side'].lower() == 'sell'])
+            symbol_orders = await self._sync_symbol_orders(symbol)
+            sides = [o['order']['side'].lower() for o in symbol_orders]
+            active_buys = sides.count('buy')
+            active_sells = sides.count('sell')
 
             # Auto-cleanup: If no positions and no pending orders, remove from active_grids
             # This allows the bot to re-run setup_grid (with RSI/BTC checks) on next cycle
             if active_sells == 0 and active_buys == 0:
                 logging.info(f"[GRID] {symbol} has no open positions or pending orders. Removing from active grids for fresh setup.")
                 del self.active_grids[symbol]
-                return  # Exit early, next cycle will call setup_grid()
-
-            logging.info(f"[GRID] Monitoring {symbol} | Price: ${current_price:.4f} | Open Positions: {active_sells} | Pending Buys: {active_buys}")
+                return True  # Exit early, next cycle will call setup_grid()
 
+            logging.info(
+                "[GRID] Monitoring %s | Price: $%.4f | Open Positions: %d | Pending Buys: %d",
+                symbol, current_price, active_sells, active_buys
+            )
+            return True
 
         except Exception as e:
             logging.error(f"[GRID] Error monitoring grid for {symbol}: {e}")
+            return False
 
     async def handle_filled_order(self, order_data: dict):
         """
@@ -737,13 +804,13 @@ class GridTradingBot:
             )
 
             if new_order:
-                self.pending_orders[new_order['id']] = {
+                self._track_order(new_order['id'], {
                     'symbol': symbol,
                     'level': opposite['level'],
                     'order': new_order,
                     'grid_cycle_id': order_data['grid_cycle_id'],
                     'entry_price': opposite['entry_price']
-                }
+                })
 
                 # Save BUY execution and SELL order creation to DB
                 pnl = 0.0
@@ -773,7 +840,7 @@ class GridTradingBot:
                             }
                         }
                         # Update existing cycle
-                        if not self.db.update_trade_by_cycle(order_data['grid_cycle_id'], trade_data):
+                        if not self.db.update_trade_by_cycle(order_data['grid_cycle_id'], trade_data, status='PENDING'):
                             self.db.log_trade(trade_data)
 
                     else:
@@ -790,7 +857,7 @@ class GridTradingBot:
                             'pnl': realized_pnl,
                             'updated_at': 'now()'
                         }
-                        self.db.update_trade_by_cycle(order_data['grid_cycle_id'], close_data)
+                        self.db.update_trade_by_cycle(order_data['grid_cycle_id'], close_data, status='OPEN')
 
                         # Send profit notification 💰
                         entry_price = order_data.get('entry_price', filled_order['price'])
@@ -850,6 +917,8 @@ class GridTradingBot:
             logging.error(f"[GRID] Error handling filled order: {e}")
 
 if __name__ == "__main__":
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     bot = GridTradingBot()
     loop = asyncio.get_event_loop()
     try:
@@ -857,4 +926,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logging.info("Stopping Bot...")
     finally:
-        loop.run_until_complete(bot.exchange.close())
+        loop.run_until_complete(bot.close())
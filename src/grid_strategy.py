@@ -1,6 +1,6 @@
-import pandas as pd
 import logging
 from typing import Dict, List, Tuple, Optional
+from src.config import Config
 
 class GridStrategy:
     """
@@ -24,33 +24,29 @@ class GridStrategy:
         self.grid_spacing_pct = grid_spacing_pct
         self.profit_pct = profit_pct
 
-    def calculate_grid_range(self, candles: list) -> Tuple[float, float, float]:
+    def calculate_grid_range(self, candles: dict) -> Tuple[float, float, float]:
         """
         Calculate price range from recent candles (24h)
 
         Args:
-            candles: OHLCV data from exchange
+            candles: OHLCV column arrays from exchange (see Exchange.get_candle_arrays)
 
         Returns:
             (range_low, range_high, mid_price)
         """
-        if not candles or len(candles) == 0:
+        if not candles or len(candles['close']) == 0:
             raise ValueError("No candle data provided")
 
-        # Convert to DataFrame for easier analysis
-        df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-
         # Get 24h range (assuming 15m candles = 96 candles for 24h)
-        lookback = min(96, len(df))
-        recent = df.tail(lookback)
+        lookback = min(96, len(candles['close']))
 
-        range_high = recent['high'].max()
-        range_low = recent['low'].min()
+        range_high = float(candles['high'][-lookback:].max())
+        range_low = float(candles['low'][-lookback:].min())
 
         # Use current price (last close) as mid_price to center the grid effectively
         # This prevents the 'rebalance loop' where a lagging MA-based mid_price
         # causes all buy orders to be above current price (and thus ignored).
-        mid_price = float(recent['close'].iloc[-1])
+        mid_price = float(candles['close'][-1])
 
         logging.info(f"[GRID] Range calculated: Low=${range_low:.4f} | High=${range_high:.4f} | Mid (Current)=${mid_price:.4f}")
 
@@ -112,7 +108,6 @@ class GridStrategy:
         """
         Check if rebalancing is needed using Config threshold
         """
-        from src.config import Config
         threshold = Config.GRID_REBALANCE_THRESHOLD
 
         range_low, range_high = grid_range
@@ -147,8 +142,6 @@ class GridStrategy:
         Returns:
             True if price dropped >= threshold below range_low (needs recalculation)
         """
-        from src.config import Config
-
         if not Config.RANGE_STOP_ENABLED:
             return False
 
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
+from src.config import Config
+
+# Messages queued within this window are sent together as one Telegram message
+BATCH_WINDOW = 0.5  # seconds
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit per message
+BATCH_SEPARATOR = "\n\n———\n\n"
+
+# Telegram allows about one message per second to the same chat
+MIN_SEND_INTERVAL = 1.0  # seconds
+
+# Attempts per message when Telegram answers 429 or a transient network error
+MAX_SEND_ATTEMPTS = 3
+
+# HTTP pool for the Bot: a few keep-alive connections, and callers wait up to
+# POOL_TIMEOUT for a free one instead of failing with "pool is full" (default 1s)
+POOL_SIZE = 8
+POOL_TIMEOUT = 10.0  # seconds
+
+# Static messages shared by both bots (built once, not per send)
+KILL_SWITCH_MESSAGE = "🚨 **KILL SWITCH ACTIVATED**\nTrading halted for safety."
+
+class TelegramNotifier:
+    """
+    Telegram notifications shared by the bots.
+
+    Holds one Bot with a pooled keep-alive HTTP client for the whole process,
+    so messages reuse open connections instead of paying a new TCP/TLS
+    handshake each. notify() only queues the message; a single background
+    worker coalesces bursts (e.g. several closes in one cycle) into as few
+    requests as possible, so trading code never waits on Telegram.
+    Call close() on shutdown to flush queued messages.
+    """
+
+    def __init__(self, token=None, chat_id=None):
+        self.token = token or Config.TELEGRAM_BOT_TOKEN
+        self.chat_id = chat_id or Config.TELEGRAM_CHAT_ID
+        self.request = None
+        self.bot = None
+        self._queue = None   # Created with the worker, inside the running loop
+        self._worker = None
+        self._next_send_at = 0.0  # time.monotonic() before which the next send must wait
+
+        if self.token:
+            self.request = HTTPXRequest(connection_pool_size=POOL_SIZE, pool_timeout=POOL_TIMEOUT)
+            self.bot = Bot(token=self.token, request=self.request)
+
+        # Token and chat never change, so decide once whether sending is possible
+        self.enabled = self.bot is not None and bool(self.chat_id)
+
+    async def send(self, message):
+        """
+        Send message to Telegram. Returns True if it was delivered.
+
+        A 429 is retried after the retry_after Telegram asks for, and network
+        errors after a short exponential backoff, up to MAX_SEND_ATTEMPTS.
+        """
+        if not self.enabled:
+            return False
+
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            # Pace sends to the per-chat limit instead of collecting 429s.
+            # The slot is reserved before awaiting so concurrent sends queue up behind it.
+            now = time.monotonic()
+            send_at = max(now, self._next_send_at)
+            self._next_send_at = send_at + MIN_SEND_INTERVAL
+            if send_at > now:
+                await asyncio.sleep(send_at - now)
+
+            try:
+                await self.bot.send_message(chat_id=self.chat_id, text=message)
+                return True
+            except RetryAfter as e:
+                # Hold every send (not only this one) until Telegram's window has passed
+                retry_after = e.retry_after
+                if hasattr(retry_after, 'total_seconds'):
+                    retry_after = retry_after.total_seconds()
+                self._next_send_at = max(self._next_send_at, time.monotonic() + retry_after)
+                logging.warning("Telegram rate limit (429), retrying in %s s", retry_after)
+            except BadRequest as e:
+                # Subclass of NetworkError, but resending the same request cannot succeed
+                logging.error(f"Telegram Error: {e}")
+                return False
+            except NetworkError as e:
+                # Timeouts and connection drops are transient: back off 1s, 2s, ...
+                self._next_send_at = max(self._next_send_at, time.monotonic() + 2 ** attempt)
+                logging.warning("Telegram network error (attempt %d/%d): %s", attempt + 1, MAX_SEND_ATTEMPTS, e)
+            except TelegramError as e:
+                logging.error(f"Telegram Error: {e}")
+                return False
+            except Exception as e:
+                logging.error(f"Unexpected error sending Telegram message: {e}")
+                return False
+
+        logging.error(f"Telegram message dropped after {MAX_SEND_ATTEMPTS} attempts")
+        return False
+
+    def notify(self, message):
+        """Queue message for the background worker (fire-and-forget)."""
+        if not self.enabled:
+            return
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._drain())
+        self._queue.put_nowait(message)
+
+    async def _drain(self):
+        """Send queued messages, merging those that arrive within BATCH_WINDOW."""
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(BATCH_WINDOW)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            for text in self._pack(batch):
+                await self.send(text)
+            for _ in batch:
+                self._queue.task_done()
+
+    @staticmethod
+    def _pack(messages):
+        """Join messages into as few texts as fit in Telegram's length limit."""
+        texts = []
+        current = None
+        for message in messages:
+            if current is None:
+                current = message
+            elif len(current) + len(BATCH_SEPARATOR) + len(message) <= MAX_MESSAGE_LENGTH:
+                current += BATCH_SEPARATOR + message
+            else:
+                texts.append(current)
+                current = message
+        if current is not None:
+            texts.append(current)
+        return texts
+
+    async def close(self):
+        """Flush queued notifications, then close the pooled HTTP client."""
+        if self._worker:
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self.request:
+            await self.request.shutdown()
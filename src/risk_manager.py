@@ -1,15 +1,57 @@
 from src.database import Database
 from src.config import Config
+from src.backoff import Backoff
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 import logging
+import time
+
+@lru_cache(maxsize=1024)
+def _parse_close_time(value):
+    """Parse a trade close_time from the DB (cached: the same timestamps are re-read across checks)."""
+    # Python 3.11+ parses 'Z' and any number of fractional digits natively
+    return datetime.fromisoformat(value)
 
 class RiskManager:
+    __slots__ = ('db', '_settings_cache', '_settings_expires_at', '_cooldown_cache')
+
+    # Circuit breaker settings rarely change, so keep them for a short while
+    SETTINGS_CACHE_TTL = 60  # seconds
+
     def __init__(self):
         self.db = Database()
+        self._settings_cache = None
+        self._settings_expires_at = 0.0
+        self._cooldown_cache = None  # {symbol: last close datetime}, filled by preload_cooldowns
+
+    def get_circuit_breaker_settings(self):
+        """
+        Fetch circuit breaker settings (max daily loss, cooldown).
+        Served from a short-lived cache to avoid a Supabase round-trip on every entry validation;
+        edits to the row (made outside the bot) take effect within SETTINGS_CACHE_TTL.
+        The kill switch flag is intentionally NOT cached (see check_kill_switch).
+        """
+        now = time.monotonic()
+        if self._settings_cache is not None and now < self._settings_expires_at:
+            return self._settings_cache
+
+        client = self.db.get_client()
+        response = client.table('circuit_breaker')\
+            .select('max_daily_loss_percent, cooldown_minutes')\
+            .eq('id', 1)\
+            .execute()
+
+        if not response.data:
+            return None
+
+        self._settings_cache = response.data[0]
+        self._settings_expires_at = now + self.SETTINGS_CACHE_TTL
+        return self._settings_cache
 
     def check_kill_switch(self):
         """Check if system is active. Returns False if kill switch is activated."""
         max_retries = 3
+        backoff = Backoff(base=1.0, cap=4.0)
         for attempt in range(max_retries):
             try:
                 client = self.db.get_client()
@@ -26,13 +68,12 @@ class RiskManager:
                 return True
             except Exception as e:
                 if attempt < max_retries - 1:
-                    logging.warning(f"⚠️ Kill switch check failed (attempt {attempt+1}/{max_retries}). Retrying in 2s...")
-                    import asyncio
+                    delay = backoff.next_delay()
+                    logging.warning(f"⚠️ Kill switch check failed (attempt {attempt+1}/{max_retries}). Retrying in {delay:.1f}s...")
                     # Note: RiskManager is used in an async context, but check_kill_switch might be called sync or async.
                     # In bot.py it is called as: if not self.risk_manager.check_kill_switch():
                     # So it's currently synchronous. We'll use time.sleep for simplicity since it's a critical safety check.
-                    import time
-                    time.sleep(2)
+                    time.sleep(delay)
                 else:
                     logging.error(f"❌ Critical Error checking kill switch after {max_retries} attempts: {e}")
                     return False
@@ -47,46 +88,29 @@ class RiskManager:
             client = self.db.get_client()
 
             # Get circuit breaker settings
-            cb_response = client.table('circuit_breaker')\
-                .select('max_daily_loss_percent')\
-                .eq('id', 1)\
-                .execute()
-
-            if not cb_response.data:
+            settings = self.get_circuit_breaker_settings()
+            if not settings:
                 logging.warning("Circuit breaker settings not found")
                 return True
 
-            max_loss_pct = float(cb_response.data[0]['max_daily_loss_percent'])
+            max_loss_pct = float(settings['max_daily_loss_percent'])
 
-            # Calculate today's start (00:00 UTC)
-            today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-
-            # Get all closed trades from today
-            trades_response = client.table('trades')\
-                .select('pnl')\
-                .eq('status', 'CLOSED')\
-                .eq('mode', Config.TRADING_MODE)\
-                .gte('close_time', today_start.isoformat())\
-                .execute()
-
-            if not trades_response.data:
-                return True
-
-            # Calculate total PnL for today
-            total_pnl = sum(float(trade['pnl']) for trade in trades_response.data if trade['pnl'])
+            total_pnl = self._get_daily_pnl(client)
 
             # Check if loss exceeds threshold
             max_loss_amount = current_balance * max_loss_pct
 
             if total_pnl < 0 and abs(total_pnl) >= max_loss_amount:
-                logging.critical(f"🚨 DAILY LOSS LIMIT EXCEEDED: {total_pnl:.2f} USDT ({(total_pnl/current_balance)*100:.2f}%)")
-
-                # Activate kill switch
-                client.table('circuit_breaker')\
+                # Activate kill switch atomically: only the caller that flips it logs the breach
+                response = client.table('circuit_breaker')\
                     .update({'is_system_active': False, 'updated_at': datetime.now(timezone.utc).isoformat()})\
                     .eq('id', 1)\
+                    .eq('is_system_active', True)\
                     .execute()
 
+                if response.data:
+                    logging.critical(f"🚨 DAILY LOSS LIMIT EXCEEDED: {total_pnl:.2f} USDT ({(total_pnl/current_balance)*100:.2f}%)")
+
                 return False
 
             return True
@@ -94,45 +118,108 @@ class RiskManager:
             logging.error(f"Error checking daily loss: {e}")
             return True
 
-    def check_cooldown(self, symbol):
+    def _get_daily_pnl(self, client):
         """
-        Check if symbol is in cooldown period.
-        Returns False if last trade was closed less than cooldown_minutes ago.
+        Total PnL of trades closed today (00:00 UTC), summed server-side
+        (see migration_daily_pnl.sql). If the RPC is unavailable (migration not
+        applied) or fails, sum the closed trades client-side instead, so the
+        daily loss guard never silently stops working.
         """
         try:
-            client = self.db.get_client()
+            pnl_response = client.rpc('get_daily_pnl', {'p_mode': Config.TRADING_MODE}).execute()
+            return float(pnl_response.data or 0)
+        except Exception as e:
+            logging.error(f"get_daily_pnl RPC failed, summing today's trades instead: {e}")
 
-            # Get cooldown settings
-            cb_response = client.table('circuit_breaker')\
-                .select('cooldown_minutes')\
-                .eq('id', 1)\
-                .execute()
+        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        trades_response = client.table('trades')\
+            .select('pnl')\
+            .eq('status', 'CLOSED')\
+            .eq('mode', Config.TRADING_MODE)\
+            .gte('close_time', today_start.isoformat())\
+            .execute()
 
-            if not cb_response.data:
+        return sum(float(trade['pnl']) for trade in trades_response.data or [] if trade['pnl'])
+
+    def preload_cooldowns(self):
+        """
+        Load the last close time of every symbol still inside the cooldown window
+        with a single query, so check_cooldown becomes an in-memory lookup.
+        """
+        try:
+            settings = self.get_circuit_breaker_settings()
+            if not settings:
                 logging.warning("Circuit breaker settings not found")
-                return True
+                return
 
-            cooldown_minutes = int(cb_response.data[0]['cooldown_minutes'])
+            cooldown_minutes = int(settings['cooldown_minutes'])
+            window_start = datetime.now(timezone.utc) - timedelta(minutes=cooldown_minutes)
 
-            # Get last closed trade for this symbol
+            client = self.db.get_client()
             trades_response = client.table('trades')\
-                .select('close_time')\
-                .eq('symbol', symbol)\
+                .select('symbol, close_time')\
                 .eq('status', 'CLOSED')\
                 .eq('mode', Config.TRADING_MODE)\
-                .order('close_time', desc=True)\
-                .limit(1)\
+                .gte('close_time', window_start.isoformat())\
                 .execute()
 
-            if not trades_response.data:
+            cache = {}
+            for trade in trades_response.data or []:
+                close_time = _parse_close_time(trade['close_time'])
+                if trade['symbol'] not in cache or close_time > cache[trade['symbol']]:
+                    cache[trade['symbol']] = close_time
+
+            self._cooldown_cache = cache
+            logging.info(f"Loaded cooldowns for {len(cache)} symbols")
+        except Exception as e:
+            logging.error(f"Error preloading cooldowns: {e}")
+
+    def set_trade_cooldown(self, symbol, close_time=None):
+        """Record a trade close so the symbol's cooldown starts without a DB query."""
+        if self._cooldown_cache is not None:
+            self._cooldown_cache[symbol] = close_time or datetime.now(timezone.utc)
+
+    def check_cooldown(self, symbol):
+        """
+        Check if symbol is in cooldown period.
+        Returns False if last trade was closed less than cooldown_minutes ago.
+        Uses the preloaded cooldown cache when available, otherwise queries the DB.
+        """
+        try:
+            # Get cooldown settings
+            settings = self.get_circuit_breaker_settings()
+            if not settings:
+                logging.warning("Circuit breaker settings not found")
                 return True
 
-            last_close_time = datetime.fromisoformat(trades_response.data[0]['close_time'].replace('Z', '+00:00'))
+            cooldown_minutes = int(settings['cooldown_minutes'])
+
+            if self._cooldown_cache is not None:
+                last_close_time = self._cooldown_cache.get(symbol)
+                if last_close_time is None:
+                    return True
+            else:
+                # Get last closed trade for this symbol
+                client = self.db.get_client()
+                trades_response = client.table('trades')\
+                    .select('close_time')\
+                    .eq('symbol', symbol)\
+                    .eq('status', 'CLOSED')\
+                    .eq('mode', Config.TRADING_MODE)\
+                    .order('close_time', desc=True)\
+                    .limit(1)\
+                    .execute()
+
+                if not trades_response.data:
+                    return True
+
+                last_close_time = _parse_close_time(trades_response.data[0]['close_time'])
+
             time_since_close = datetime.now(timezone.utc) - last_close_time
 
             if time_since_close < timedelta(minutes=cooldown_minutes):
                 remaining = cooldown_minutes - (time_since_close.total_seconds() / 60)
-                logging.warning(f"⏳ COOLDOWN ACTIVE for {symbol}: {remaining:.1f} minutes remaining")
+                logging.warning("⏳ COOLDOWN ACTIVE for %s: %.1f minutes remaining", symbol, remaining)
                 return False
 
             return True
@@ -1,5 +1,138 @@
-import pandas as pd
-import pandas_ta as ta
+import numpy as np
+
+class IndicatorState:
+    """
+    Running EMA 50/200, ATR and ADX (Wilder) for one symbol.
+
+    Updated once per CLOSED candle with O(1) recurrences instead of recomputing
+    every indicator over the whole candle window on each check.
+    Values stay None until enough candles have been seen.
+    """
+    __slots__ = (
+        'ema_short_len', 'ema_long_len', 'adx_len', 'atr_len', 'count', 'last_ts',
+        'close', 'high', 'low', 'ema_short', 'ema_long', 'atr', 'adx',
+        'prev_close', 'prev_ema_short', 'prev_ema_long', 'live_close', 'live_ema_short',
+        'signal_ts', 'signal', '_ema_short_sum', '_ema_long_sum', '_tr_sum',
+        '_tr_smooth', '_pdm_smooth', '_ndm_smooth', '_dx_sum',
+    )
+
+    def __init__(self, ema_short_len=50, ema_long_len=200, adx_len=14, atr_len=14):
+        self.ema_short_len = ema_short_len
+        self.ema_long_len = ema_long_len
+        self.adx_len = adx_len
+        self.atr_len = atr_len
+
+        self.count = 0          # Closed candles processed
+        self.last_ts = None     # Open time of the last processed closed candle
+
+        # Last closed candle ("curr") and the one before it ("prev")
+        self.close = None
+        self.high = None
+        self.low = None
+        self.ema_short = None
+        self.ema_long = None
+        self.atr = None
+        self.adx = None
+        self.prev_close = None
+        self.prev_ema_short = None
+        self.prev_ema_long = None
+
+        # Still-open candle (refreshed on every check, not committed)
+        self.live_close = None
+        self.live_ema_short = None
+
+        # Entry signal evaluated for the candle at signal_ts (see Strategy.check_signal)
+        self.signal_ts = None
+        self.signal = (None, None)
+
+        # Seeding / smoothing accumulators
+        self._ema_short_sum = 0.0
+        self._ema_long_sum = 0.0
+        self._tr_sum = 0.0
+        self._tr_smooth = 0.0
+        self._pdm_smooth = 0.0
+        self._ndm_smooth = 0.0
+        self._dx_sum = 0.0
+
+    def _ema_step(self, ema, running_sum, length, close):
+        """EMA seeded with the SMA of the first `length` closes. Returns (ema, running_sum)."""
+        if self.count < length:
+            running_sum += close
+            if self.count == length - 1:
+                ema = running_sum / length
+            return ema, running_sum
+        k = 2.0 / (length + 1)
+        return close * k + ema * (1 - k), running_sum
+
+    def update(self, ts, high, low, close):
+        """Fold one closed candle into the running indicators."""
+        self.prev_close = self.close
+        self.prev_ema_short = self.ema_short
+        self.prev_ema_long = self.ema_long
+
+        self.ema_short, self._ema_short_sum = self._ema_step(self.ema_short, self._ema_short_sum, self.ema_short_len, close)
+        self.ema_long, self._ema_long_sum = self._ema_step(self.ema_long, self._ema_long_sum, self.ema_long_len, close)
+
+        if self.count > 0:
+            # True Range and Directional Movement need the previous candle
+            tr = max(high - low, abs(high - self.close), abs(low - self.close))
+            up_move = high - self.high
+            down_move = self.low - low
+            pdm = up_move if (up_move > down_move and up_move > 0) else 0.0
+            ndm = down_move if (down_move > up_move and down_move > 0) else 0.0
+            n_tr = self.count  # Number of TR values including this one
+
+            # ATR (Wilder)
+            if n_tr <= self.atr_len:
+                self._tr_sum += tr
+                if n_tr == self.atr_len:
+                    self.atr = self._tr_sum / self.atr_len
+            else:
+                self.atr = (self.atr * (self.atr_len - 1) + tr) / self.atr_len
+
+            # ADX (Wilder)
+            n = self.adx_len
+            if n_tr <= n:
+                self._tr_smooth += tr
+                self._pdm_smooth += pdm
+                self._ndm_smooth += ndm
+            else:
+                self._tr_smooth += tr - self._tr_smooth / n
+                self._pdm_smooth += pdm - self._pdm_smooth / n
+                self._ndm_smooth += ndm - self._ndm_smooth / n
+
+            if n_tr >= n:
+                pdi = 100 * self._pdm_smooth / self._tr_smooth if self._tr_smooth else 0.0
+                ndi = 100 * self._ndm_smooth / self._tr_smooth if self._tr_smooth else 0.0
+                dx = 100 * abs(pdi - ndi) / (pdi + ndi) if (pdi + ndi) else 0.0
+                n_dx = n_tr - n + 1
+                if n_dx <= n:
+                    self._dx_sum += dx
+                    if n_dx == n:
+                        self.adx = self._dx_sum / n
+                else:
+                    self.adx = (self.adx * (n - 1) + dx) / n
+
+        self.close = close
+        self.high = high
+        self.low = low
+        self.last_ts = ts
+        self.count += 1
+
+    def set_live(self, close):
+        """Track the still-open candle without committing it to the running state."""
+        self.live_close = close
+        if self.ema_short is None:
+            self.live_ema_short = None
+        else:
+            k = 2.0 / (self.ema_short_len + 1)
+            self.live_ema_short = close * k + self.ema_short * (1 - k)
+
+# Entry reasons per side: (EMA 50 breakout, 50/200 cross)
+SIGNAL_REASONS = {
+    "LONG": ("Trend Continuation UP (EMA 50 Breakout)", "Golden Cross (50/200)"),
+    "SHORT": ("Trend Continuation DOWN (EMA 50 Breakdown)", "Death Cross (50/200)"),
+}
 
 class Strategy:
     def __init__(self):
@@ -10,108 +143,135 @@ class Strategy:
         self.adx_threshold = 20
         self.atr_len = 14
 
-    def parse_data(self, ohlcv):
-        """Convert CCXT ohlcv to Pandas DataFrame."""
-        if not ohlcv or len(ohlcv) == 0:
-            return pd.DataFrame()
+        # Candles needed to seed the indicators, and per call once seeded
+        # (the few candles closed since the last check plus the open one)
+        self.history_len = 300
+        self.tail_len = 5
 
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
+        # Incremental indicator state per symbol
+        self.states = {}  # {symbol: IndicatorState}
 
-    def calculate_indicators(self, df):
-        """Calculate EMAs, ADX and ATR."""
-        if df.empty or len(df) < self.ema_long_len:
-            return df
+    def candles_needed(self, symbol):
+        """How many of the newest candles update_indicators needs for this symbol."""
+        state = self.states.get(symbol)
+        if state is None or state.count < self.ema_long_len:
+            return self.history_len
+        return self.tail_len
 
-        # EMAs
-        df['ema_50'] = ta.ema(df['close'], length=self.ema_short_len)
-        df['ema_200'] = ta.ema(df['close'], length=self.ema_long_len)
+    def update_indicators(self, symbol, candles):
+        """
+        Bring the symbol's IndicatorState up to date with OHLCV column arrays
+        (see Exchange.get_candle_arrays). The last candle is treated as still open.
+        Only candles closed since the previous call are processed, so once seeded
+        only the last few candles (see candles_needed) have to be passed in.
 
-        # ADX (Returns DataFrame: ADX_14, DMP_14, DMN_14)
-        adx = ta.adx(df['high'], df['low'], df['close'], length=self.adx_len)
-        if adx is not None:
-            df = pd.concat([df, adx], axis=1)
-            # Normalize column name
-            df['adx'] = df[f'ADX_{self.adx_len}']
+        Returns None when the candles start after the last processed one (a gap,
+        e.g. after a pause): the state is dropped, and the caller must pass a full
+        window again (candles_needed then asks for history_len).
+        """
+        timestamps = candles['timestamp']
+        closed = len(timestamps) - 1
+        state = self.states.get(symbol)
+
+        # (Re)seed when there is no state yet, or it is not seeded: a state that
+        # never saw enough candles is rebuilt from the (full) window it is given
+        if state is None or state.count < self.ema_long_len:
+            state = IndicatorState(self.ema_short_len, self.ema_long_len, self.adx_len, self.atr_len)
+            self.states[symbol] = state
+            start = 0
+        elif timestamps[0] > state.last_ts:
+            # Candles were missed: a short tail cannot seed EMA 200 / ADX, so
+            # drop the state instead of rebuilding from it
+            del self.states[symbol]
+            return None
+        else:
+            start = int(np.searchsorted(timestamps[:closed], state.last_ts, side='right'))
 
-        # ATR (For volatility-based stops)
-        df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=self.atr_len)
+        highs, lows, closes = candles['high'], candles['low'], candles['close']
+        for i in range(start, closed):
+            state.update(timestamps[i], float(highs[i]), float(lows[i]), float(closes[i]))
 
-        return df
+        if closed >= 0:
+            state.set_live(float(closes[-1]))
+        return state
 
-    def check_signal(self, df):
+    def check_signal(self, state):
         """
         Check for ENTRY signals (LONG or SHORT) based on Trend Following.
+        Uses the last closed candle (curr) and the one before it (prev) from the IndicatorState.
+        The signal only changes when a candle closes, so it is evaluated once per
+        closed candle and repeated checks within the same candle reuse the result.
         """
-        if df.empty or len(df) < self.ema_long_len:
+        if state.signal_ts != state.last_ts:
+            state.signal = self._evaluate_signal(state)
+            state.signal_ts = state.last_ts
+        signal_side, data = state.signal
+        return signal_side, (dict(data) if data else None)
+
+    def _evaluate_signal(self, state):
+        if state.count < self.ema_long_len or state.adx is None or state.prev_ema_long is None:
             return None, None
 
-        curr = df.iloc[-2] # Last closed candle
-        prev = df.iloc[-3]
+        # Weak trend: no entry. This is the common case, so decide it first
+        if state.adx <= self.adx_threshold:
+            return None, None
 
         # Trend Indicators
-        ema_short = curr['ema_50']
-        ema_long = curr['ema_200']
-
-        strong_trend = curr['adx'] > self.adx_threshold
-
-        signal_side = None
-        reason = ""
-
-        if strong_trend:
-            # --- LONG LOGIC ---
-            if ema_short > ema_long: # Bullish Trend
-                # Price Cross over EMA 50 (Trend Continuation)
-                if (curr['close'] > ema_short) and (prev['close'] <= prev['ema_50']):
-                    signal_side = "LONG"
-                    reason = "Trend Continuation UP (EMA 50 Breakout)"
-                # Golden Cross (Rare but Strong)
-                elif (curr['ema_50'] > curr['ema_200']) and (prev['ema_50'] <= prev['ema_200']):
-                    signal_side = "LONG"
-                    reason = "Golden Cross (50/200)"
-
-            # --- SHORT LOGIC ---
-            elif ema_short < ema_long: # Bearish Trend
-                # Price Cross under EMA 50 (Trend Continuation Down)
-                if (curr['close'] < ema_short) and (prev['close'] >= prev['ema_50']):
-                    signal_side = "SHORT"
-                    reason = "Trend Continuation DOWN (EMA 50 Breakdown)"
-                # Death Cross (Rare but Strong)
-                elif (curr['ema_50'] < curr['ema_200']) and (prev['ema_50'] >= prev['ema_200']):
-                    signal_side = "SHORT"
-                    reason = "Death Cross (50/200)"
-
-        if signal_side:
-            return signal_side, {
-                "ema_50": float(curr['ema_50']),
-                "ema_200": float(curr['ema_200']),
-                "adx": float(curr['adx']),
-                "atr": float(curr['atr']),
-                "price": float(curr['close']),
-                "signal_reason": reason
-            }
-
-        return None, None
-
-    def check_exit(self, df, position_side):
+        ema_short = state.ema_short
+        ema_long = state.ema_long
+        close = state.close
+        prev_close = state.prev_close
+        prev_ema_short = state.prev_ema_short
+        prev_ema_long = state.prev_ema_long
+
+        if ema_short > ema_long: # Bullish Trend -> LONG
+            signal_side = "LONG"
+            # Price Cross over EMA 50 (Trend Continuation)
+            breakout = (close > ema_short) and (prev_close <= prev_ema_short)
+            # Golden Cross (Rare but Strong)
+            cross = prev_ema_short <= prev_ema_long
+        elif ema_short < ema_long: # Bearish Trend -> SHORT
+            signal_side = "SHORT"
+            # Price Cross under EMA 50 (Trend Continuation Down)
+            breakout = (close < ema_short) and (prev_close >= prev_ema_short)
+            # Death Cross (Rare but Strong)
+            cross = prev_ema_short >= prev_ema_long
+        else:
+            return None, None
+
+        if not (breakout or cross):
+            return None, None
+
+        # Only build the payload once a signal has fired
+        return signal_side, {
+            "ema_50": float(ema_short),
+            "ema_200": float(ema_long),
+            "adx": float(state.adx),
+            "atr": float(state.atr),
+            "price": float(close),
+            "signal_reason": SIGNAL_REASONS[signal_side][0 if breakout else 1]
+        }
+
+    def check_exit(self, state, position_side):
         """
         Check for EXIT signals based on Trend Reversal.
+        Compares the still-open candle against its running EMA 50.
         """
-        if df.empty:
+        if state is None or state.live_ema_short is None:
             return False, "No Data"
 
-        curr = df.iloc[-1] # Current candle
+        close = state.live_close
+        ema_short = state.live_ema_short
 
         # LONG Exit: Close < EMA 50 (Lost short-term momentum) OR Close < EMA 200 (Trend Dead)
         # To be purely trend following on 15m, losing the EMA 50 is a good tactical exit.
         if position_side == "LONG":
-            if curr['close'] < curr['ema_50']:
+            if close < ema_short:
                 return True, "Trend Weakness (Close < EMA 50)"
 
         # SHORT Exit: Close > EMA 50 (Gained short-term momentum)
         if position_side == "SHORT":
-            if curr['close'] > curr['ema_50']:
+            if close > ema_short:
                 return True, "Trend Weakness (Close > EMA 50)"
 
         return False, None
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Make the `src` package importable when running pytest from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# src.config validates these at import time; tests never reach Supabase
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test-key')
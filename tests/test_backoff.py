@@ -0,0 +1,49 @@
+import math
+
+from src.backoff import Backoff, SymbolBreaker
+
+
+def test_backoff_grows_and_caps():
+    backoff = Backoff(base=1.0, cap=4.0, jitter=0.0)
+    assert [backoff.next_delay() for _ in range(4)] == [1.0, 2.0, 4.0, 4.0]
+    backoff.reset()
+    assert backoff.next_delay() == 1.0
+
+
+def test_failing_symbol_is_skipped_on_next_pass():
+    breaker = SymbolBreaker(pass_interval=60, max_failures=5, cooldown=300)
+
+    breaker.start_pass()
+    breaker.record('BTC/USDT', False)
+    breaker.record('ETH/USDT', True)
+
+    breaker.start_pass()
+    assert breaker.should_skip('BTC/USDT')
+    assert not breaker.should_skip('ETH/USDT')
+
+
+def test_skip_grows_with_consecutive_failures():
+    breaker = SymbolBreaker(pass_interval=60, max_failures=5, cooldown=300)
+
+    # Backoff delays of 60s, 120s and 240s (plus up to 30% jitter) in passes of at least 60s
+    for min_skipped in (1, 2, 4):
+        breaker.start_pass()
+        breaker.record('BTC/USDT', False)
+        skipped = breaker.retry_pass['BTC/USDT'] - breaker.current_pass - 1
+        assert min_skipped <= skipped <= math.ceil(min_skipped * 1.3)
+        breaker.current_pass = breaker.retry_pass['BTC/USDT'] - 1  # Next visit is the retry pass
+
+
+def test_breaker_opens_after_max_failures_and_success_resets():
+    breaker = SymbolBreaker(pass_interval=60, max_failures=2, cooldown=300)
+
+    opened = []
+    for _ in range(3):
+        breaker.start_pass()
+        opened.append(breaker.record('BTC/USDT', False))
+    assert opened == [False, False, True]
+    assert breaker.retry_pass['BTC/USDT'] == breaker.current_pass + 1 + 5
+
+    breaker.record('BTC/USDT', True)
+    breaker.start_pass()
+    assert not breaker.should_skip('BTC/USDT')
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from src.bot import MrRobotTrade
+
+
+class FakeDb:
+    def __init__(self):
+        self.updates = []
+
+    def update_trade(self, trade_id, update_data):
+        self.updates.append((trade_id, update_data))
+
+
+class NoExitStrategy:
+    def check_exit(self, *args):
+        return False, ""
+
+
+def make_bot():
+    bot = object.__new__(MrRobotTrade)
+    bot.db = FakeDb()
+    bot.strategy = NoExitStrategy()
+    bot.last_heartbeat_log = {}
+    bot.notifications = []
+    bot.closed = []
+
+    async def send_notification(message):
+        bot.notifications.append(message)
+
+    async def close_trade(reason, current_price, trade):
+        bot.closed.append(reason)
+
+    bot.send_notification = send_notification
+    bot.close_trade = close_trade
+    return bot
+
+
+def make_trade(side, stop, target, trailing=None):
+    strategy_data = {'stop_loss_price': stop, 'take_profit_price': target}
+    if trailing is not None:
+        strategy_data['trailing_stop_price'] = trailing
+    return {'id': 1, 'symbol': 'BTC/USDT', 'side': side, 'entry_price': 100.0, 'strategy_data': strategy_data}
+
+
+@pytest.mark.parametrize('side, stop, target, price, new_stop', [
+    ('LONG', 98.0, 103.0, 102.1, 100.2),
+    ('SHORT', 102.0, 97.0, 97.9, 99.8),
+])
+def test_breakeven_moves_stop_past_entry(side, stop, target, price, new_stop):
+    bot = make_bot()
+    trade = make_trade(side, stop, target)
+    asyncio.run(bot.manage_trade(None, price, trade))
+
+    assert trade['strategy_data']['trailing_stop_price'] == pytest.approx(new_stop)
+    assert bot.db.updates and bot.notifications
+    assert bot.closed == []
+
+
+@pytest.mark.parametrize('side, stop, target, price', [
+    ('LONG', 98.0, 103.0, 101.0),   # Below entry + risk
+    ('LONG', 99.9, 103.0, 100.3),   # Past entry + risk, but under the 0.5% minimum move
+    ('SHORT', 102.0, 97.0, 99.0),
+    ('SHORT', 100.1, 97.0, 99.7),
+])
+def test_breakeven_waits_for_risk_and_minimum_move(side, stop, target, price):
+    bot = make_bot()
+    trade = make_trade(side, stop, target)
+    asyncio.run(bot.manage_trade(None, price, trade))
+
+    assert 'trailing_stop_price' not in trade['strategy_data']
+    assert bot.closed == []
+
+
+@pytest.mark.parametrize('side, stop, target, trailing, price, hit', [
+    ('LONG', 98.0, 103.0, 100.2, 100.1, True),
+    ('LONG', 98.0, 103.0, 100.2, 100.3, False),
+    ('SHORT', 102.0, 97.0, 99.8, 99.9, True),
+    ('SHORT', 102.0, 97.0, 99.8, 99.7, False),
+])
+def test_trailing_stop_hit(side, stop, target, trailing, price, hit):
+    bot = make_bot()
+    trade = make_trade(side, stop, target, trailing=trailing)
+    asyncio.run(bot.manage_trade(None, price, trade))
+
+    assert bot.closed == ([f"Trailing Stop Hit ({trailing:.2f})"] if hit else [])
+
+
+class FakeClosable:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_close_logs_pending_close_pnl_first():
+    bot = make_bot()
+    bot.exchange = FakeClosable()
+    bot.notifier = FakeClosable()
+    bot.unlogged_close_pnl = [1.5, -0.5]
+    logged = []
+
+    async def log_balance_after_close(pnl):
+        assert not bot.exchange.closed
+        logged.append(pnl)
+
+    bot.log_balance_after_close = log_balance_after_close
+    asyncio.run(bot.close())
+
+    assert logged == [1.0]
+    assert bot.unlogged_close_pnl == []
+    assert bot.exchange.closed and bot.notifier.closed
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.candle_ring import CandleRing
+
+
+def candle(ts, close=1.0):
+    return [ts, close, close, close, close, 10.0]
+
+
+def test_view_is_oldest_first_after_wraparound():
+    ring = CandleRing(capacity=4)
+    for ts in range(6):
+        ring.append(candle(ts))
+
+    assert len(ring) == 4
+    assert ring.last_timestamp == 5
+    assert list(ring.view()['timestamp']) == [2, 3, 4, 5]
+    assert list(ring.view(limit=3)['timestamp']) == [3, 4, 5]
+    assert list(ring.view(limit=10)['timestamp']) == [2, 3, 4, 5]
+
+
+def test_view_copies_contiguous_arrays():
+    ring = CandleRing(capacity=4)
+    for ts in range(5):
+        ring.append(candle(ts))
+
+    view = ring.view()
+    assert all(values.flags['C_CONTIGUOUS'] for values in view.values())
+    view['close'][:] = 0
+    assert np.all(ring.view()['close'] == 1.0)
+
+
+def test_update_last_overwrites_newest_candle():
+    ring = CandleRing(capacity=4)
+    ring.append(candle(1))
+    ring.append(candle(2))
+    ring.update_last(candle(2, close=5.0))
+
+    view = ring.view()
+    assert list(view['timestamp']) == [1, 2]
+    assert list(view['close']) == [1.0, 5.0]
+
+
+def test_push_updates_appends_or_ignores_by_timestamp():
+    ring = CandleRing(capacity=4)
+    ring.push(candle(1))
+    ring.push(candle(2))
+    ring.push(candle(2, close=5.0))  # Same open time: still-open candle update
+    ring.push(candle(1, close=9.0))  # Older than the newest: ignored
+    ring.push(candle(3))
+
+    view = ring.view()
+    assert list(view['timestamp']) == [1, 2, 3]
+    assert list(view['close']) == [1.0, 5.0, 1.0]
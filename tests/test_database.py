@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from src.database import Database
+
+
+class FakeQuery:
+    """Records the postgrest builder calls and returns the configured rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(('table', name))
+        return self
+
+    def update(self, data):
+        self.calls.append(('update', data))
+        return self
+
+    def eq(self, column, value):
+        self.calls.append(('eq', column, value))
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def make_db(rows):
+    db = object.__new__(Database)
+    db.client = FakeQuery(rows)
+    return db
+
+
+def test_update_trade_by_cycle_is_scoped_to_status():
+    db = make_db([{'id': 1}])
+    assert db.update_trade_by_cycle('cycle-1', {'status': 'CLOSED'}, status='OPEN')
+    assert db.client.calls == [
+        ('table', 'trades_mrrobot'),
+        ('update', {'status': 'CLOSED'}),
+        ('eq', 'strategy_data->>grid_cycle_id', 'cycle-1'),
+        ('eq', 'status', 'OPEN'),
+    ]
+
+
+def test_update_trade_by_cycle_returns_none_without_match():
+    db = make_db([])
+    assert db.update_trade_by_cycle('cycle-1', {'status': 'OPEN'}, status='PENDING') is None
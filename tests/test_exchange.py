@@ -0,0 +1,100 @@
+import asyncio
+
+import src.exchange
+from src.exchange import Exchange
+
+TIMEFRAME_MS = 15 * 60 * 1000
+
+
+def candle(i, close=None):
+    close = 100.0 + i if close is None else close
+    return [i * TIMEFRAME_MS, close, close + 1, close - 1, close, 10.0]
+
+
+class FakeOhlcvClient:
+    """ccxt stand-in serving OHLCV rows from a list the test can extend."""
+
+    def __init__(self, candles):
+        self.candles = candles
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        if since is None:
+            return self.candles[-limit:]
+        return [c for c in self.candles if c[0] >= since][:limit]
+
+
+def make_candle_exchange(candles):
+    exchange = object.__new__(Exchange)
+    exchange.client = FakeOhlcvClient(candles)
+    exchange.timeframe = '15m'
+    exchange.candles_cache = {}
+    return exchange
+
+
+def test_candle_cache_wraps_and_updates_open_candle(monkeypatch):
+    monkeypatch.setattr(src.exchange, 'CANDLE_CACHE_SIZE', 5)
+    candles = [candle(i) for i in range(8)]
+    exchange = make_candle_exchange(candles)
+
+    arrays = asyncio.run(exchange.get_candle_arrays('BTC/USDT', limit=5))
+    assert list(arrays['timestamp'] // TIMEFRAME_MS) == [3, 4, 5, 6, 7]
+
+    # The open candle 7 moves and candle 8 opens: 7 is updated in place, 8 wraps around
+    candles[7] = candle(7, close=150.0)
+    candles.append(candle(8))
+    arrays = asyncio.run(exchange.get_candle_arrays('BTC/USDT', limit=5))
+    assert list(arrays['timestamp'] // TIMEFRAME_MS) == [4, 5, 6, 7, 8]
+    assert list(arrays['close']) == [104.0, 105.0, 106.0, 150.0, 108.0]
+    assert all(values.flags['C_CONTIGUOUS'] for values in arrays.values())
+
+    arrays = asyncio.run(exchange.get_candle_arrays('BTC/USDT', limit=2))
+    assert list(arrays['timestamp'] // TIMEFRAME_MS) == [7, 8]
+
+
+class FakeClient:
+    """ccxt stand-in whose markets are only known after load_markets()."""
+
+    has = {'fetchLastPrices': True}
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.markets = None
+
+    async def load_markets(self):
+        self.markets = {symbol: {'symbol': f"{symbol}:USDT"} for symbol in self.prices}
+        return self.markets
+
+    def market(self, symbol):
+        if self.markets is None:
+            raise Exception('markets not loaded')
+        return self.markets[symbol]
+
+    async def fetch_last_prices(self, symbols):
+        return {self.markets[s]['symbol']: {'price': self.prices[s]} for s in symbols}
+
+
+def make_exchange(prices):
+    exchange = object.__new__(Exchange)
+    exchange.client = FakeClient(prices)
+    exchange.fallback_calls = []
+
+    async def get_current_price(symbol):
+        exchange.fallback_calls.append(symbol)
+        return None
+
+    exchange.get_current_price = get_current_price
+    return exchange
+
+
+def test_first_call_loads_markets_and_batches():
+    exchange = make_exchange({'BTC/USDT': 100.0, 'ETH/USDT': 10.0})
+    prices = asyncio.run(exchange.get_current_prices(['BTC/USDT', 'ETH/USDT']))
+    assert prices == {'BTC/USDT': 100.0, 'ETH/USDT': 10.0}
+    assert exchange.fallback_calls == []
+
+
+def test_unknown_symbol_falls_back_alone():
+    exchange = make_exchange({'BTC/USDT': 100.0})
+    prices = asyncio.run(exchange.get_current_prices(['BTC/USDT', 'XYZ/USDT']))
+    assert prices == {'BTC/USDT': 100.0}
+    assert exchange.fallback_calls == ['XYZ/USDT']
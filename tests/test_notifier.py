@@ -0,0 +1,76 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from telegram.error import RetryAfter
+
+import src.notifier
+from src.notifier import TelegramNotifier, BATCH_SEPARATOR, MAX_MESSAGE_LENGTH
+
+
+class StubBot:
+    """Bot stand-in recording send_message calls; raises the queued errors first."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+        self.calls = []
+
+    async def send_message(self, chat_id, text):
+        self.calls.append(time.monotonic())
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(text)
+
+
+def make_notifier(bot):
+    notifier = TelegramNotifier(token='123:TEST', chat_id='42')
+    notifier.bot = bot
+    return notifier
+
+
+def test_close_sends_every_queued_message():
+    bot = StubBot()
+    notifier = make_notifier(bot)
+
+    async def run():
+        for i in range(3):
+            notifier.notify(f"message {i}")
+        await notifier.close()
+
+    asyncio.run(run())
+    for i in range(3):
+        assert any(f"message {i}" in text for text in bot.sent)
+
+
+def test_burst_is_sent_as_one_message():
+    bot = StubBot()
+    notifier = make_notifier(bot)
+
+    async def run():
+        for i in range(5):
+            notifier.notify(f"message {i}")
+        await notifier.close()
+
+    asyncio.run(run())
+    assert bot.sent == [BATCH_SEPARATOR.join(f"message {i}" for i in range(5))]
+
+
+def test_pack_splits_at_message_limit():
+    half = "x" * (MAX_MESSAGE_LENGTH // 2)
+    texts = TelegramNotifier._pack(["a", "b", half, half, "c"])
+
+    assert texts == ["a" + BATCH_SEPARATOR + "b" + BATCH_SEPARATOR + half, half + BATCH_SEPARATOR + "c"]
+    assert all(len(text) <= MAX_MESSAGE_LENGTH for text in texts)
+    assert TelegramNotifier._pack([]) == []
+
+
+def test_retry_after_waits_before_resending(monkeypatch):
+    monkeypatch.setattr(src.notifier, 'MIN_SEND_INTERVAL', 0.0)
+    bot = StubBot(errors=[RetryAfter(timedelta(seconds=0.2))])
+    notifier = make_notifier(bot)
+
+    assert asyncio.run(notifier.send("hello")) is True
+    assert bot.sent == ["hello"]
+    assert len(bot.calls) == 2
+    assert bot.calls[1] - bot.calls[0] >= 0.2
@@ -0,0 +1,109 @@
+import numpy as np
+
+from src.strategy import Strategy
+
+TIMEFRAME_MS = 15 * 60 * 1000
+
+
+def make_candles(count, seed=1):
+    """Random-walk OHLCV candles as column arrays (see Exchange.get_candle_arrays)."""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, count))
+    return {
+        'timestamp': np.arange(count, dtype=np.float64) * TIMEFRAME_MS,
+        'open': closes,
+        'high': closes + 1,
+        'low': closes - 1,
+        'close': closes,
+        'volume': np.full(count, 10.0),
+    }
+
+
+def window(candles, end, length):
+    """The `length` newest candles ending at index `end` (exclusive)."""
+    return {field: values[max(0, end - length):end] for field, values in candles.items()}
+
+
+def test_tail_updates_seeded_state():
+    strategy = Strategy()
+    candles = make_candles(400)
+
+    strategy.update_indicators('BTC/USDT', window(candles, 300, strategy.history_len))
+    assert strategy.candles_needed('BTC/USDT') == strategy.tail_len
+
+    state = strategy.update_indicators('BTC/USDT', window(candles, 302, strategy.candles_needed('BTC/USDT')))
+
+    # Same result as seeding from scratch over the same history
+    fresh = Strategy().update_indicators('BTC/USDT', window(candles, 302, 302))
+    assert state.count == fresh.count == 301
+    assert np.isclose(state.ema_long, fresh.ema_long)
+    assert np.isclose(state.adx, fresh.adx)
+
+
+def test_gap_then_refill_rebuilds_seeded_state():
+    strategy = Strategy()
+    candles = make_candles(400)
+
+    strategy.update_indicators('BTC/USDT', window(candles, 300, strategy.history_len))
+
+    # 10 candles go by without an update: the short tail no longer overlaps
+    tail = window(candles, 310, strategy.candles_needed('BTC/USDT'))
+    assert strategy.update_indicators('BTC/USDT', tail) is None
+    assert strategy.candles_needed('BTC/USDT') == strategy.history_len
+
+    # The full window asked for next seeds the indicators again
+    state = strategy.update_indicators('BTC/USDT', window(candles, 310, strategy.candles_needed('BTC/USDT')))
+    assert state.count == strategy.history_len - 1
+    assert state.ema_long is not None and state.adx is not None
+    assert strategy.candles_needed('BTC/USDT') == strategy.tail_len
+
+
+def test_unseeded_state_is_rebuilt_from_full_window():
+    strategy = Strategy()
+    candles = make_candles(400)
+
+    # A new listing: too few candles to seed EMA 200
+    state = strategy.update_indicators('NEW/USDT', window(candles, 50, strategy.history_len))
+    assert state.ema_long is None
+    assert strategy.candles_needed('NEW/USDT') == strategy.history_len
+
+    state = strategy.update_indicators('NEW/USDT', window(candles, 350, strategy.history_len))
+    assert state.count == strategy.history_len - 1
+    assert state.ema_long is not None
+
+
+def reference_ema(closes, length):
+    """EMA seeded with the SMA of the first `length` closes."""
+    ema = closes[:length].mean()
+    k = 2.0 / (length + 1)
+    for close in closes[length:]:
+        ema = close * k + ema * (1 - k)
+    return ema
+
+
+def reference_atr(highs, lows, closes, length):
+    """Wilder ATR seeded with the mean of the first `length` true ranges."""
+    prev_closes = closes[:-1]
+    tr = np.maximum.reduce([highs[1:] - lows[1:], np.abs(highs[1:] - prev_closes), np.abs(lows[1:] - prev_closes)])
+    atr = tr[:length].mean()
+    for value in tr[length:]:
+        atr = (atr * (length - 1) + value) / length
+    return atr
+
+
+def test_update_indicators_matches_reference():
+    strategy = Strategy()
+    candles = make_candles(300, seed=7)
+    state = strategy.update_indicators('BTC/USDT', candles)
+
+    # The last candle is still open: indicators cover the closed ones only
+    closed = {field: values[:-1] for field, values in candles.items()}
+    assert np.isclose(state.ema_short, reference_ema(closed['close'], 50))
+    assert np.isclose(state.ema_long, reference_ema(closed['close'], 200))
+    assert np.isclose(state.atr, reference_atr(closed['high'], closed['low'], closed['close'], 14))
+    # ADX_14 from pandas_ta.adx(high, low, close, length=14) over the same closed candles
+    assert np.isclose(state.adx, 15.235597844963863)
+
+    # The open candle only moves the live EMA 50
+    k = 2.0 / 51
+    assert np.isclose(state.live_ema_short, candles['close'][-1] * k + state.ema_short * (1 - k))